@@ -1,23 +1,36 @@
+import json
 import logging
+from typing import Any, Dict, Optional, Tuple
 from config.settings import Config
 from langchain_ollama import ChatOllama
-from langchain_groq import ChatGroq
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 
 from agents.tools import tools
-from agents.prompts import prompt
+from agents.prompts import prompt, agent_prompt
 from agents.tools import search_by_feature, search_by_metadata, search_hybrid, random_search
+from agents.router import query_router
+from services.search_services import search_service
+from agents.classifier import ToolClassifier, load_classifier, log_routing_decision
+from utils.llm_cache import llm_cache
+from utils.llm_client import get_llm
 
 
 logger = logging.getLogger(__name__)
 
+tool_mapping = {
+    "search_by_feature": search_by_feature,
+    "search_by_metadata": search_by_metadata,
+    "search_hybrid": search_hybrid,
+    "random_search": random_search
+}
+
 
 def initialize_agent():
-    llm = ChatGroq(
-        model="openai/gpt-oss-20b",
-        temperature=0,
-        api_key=Config.GROQ_API_KEY
-    )
+    if Config.ROUTING_BACKEND == "classifier":
+        logger.info("Using the local embedding classifier for tool routing.")
+        return load_classifier()
+
+    llm = get_llm()
 
     # llm = ChatOllama(
     #     model="gpt-oss:20b",
@@ -36,30 +49,72 @@ def initialize_agent():
     return executor
 
 
+def record_routing_decision(query: str, tool_name: str, tool_input: Dict[str, Any]):
+    """Cache the LLM's tool call and add the chosen tool to the labelled query log"""
+    if Config.LLM_CACHE_ENABLED:
+        llm_cache.put(query, agent_prompt, Config.LLM_MODEL, json.dumps({"tool": tool_name, "tool_input": tool_input}))
+    if Config.ROUTING_LOG_ENABLED:
+        log_routing_decision(query, tool_name)
+
+
+def cached_tool_call(query: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """The (tool, tool input) the LLM chose for this query before, if cached"""
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    cached = llm_cache.get(query, agent_prompt, Config.LLM_MODEL)
+    try:
+        call = json.loads(cached) if cached else None
+        if call["tool"] in tool_mapping:
+            return call["tool"], call["tool_input"]
+    except (TypeError, ValueError, KeyError):
+        pass
+    return None
+
+
 #######################################
 ## For Groq based Tool Calling Agent ##
 #######################################
 def agent_search(executor, query: str):
+    tool_name, metadata = query_router.route(query) if Config.QUERY_ROUTER_ENABLED else (None, None)
+    if tool_name:
+        logger.info(f"Query routed locally to {tool_name} {metadata or ''}, skipping the LLM "
+                    f"({query_router.stats()['handled_fraction']:.0%} of queries handled locally).")
+        if metadata:
+            return search_service.search_by_metadata(query, metadata_json=metadata)
+        return tool_mapping[tool_name].invoke({"query": query})
+
+    if isinstance(executor, ToolClassifier):
+        tool_name = executor.predict(query)
+        logger.info(f"Classifier routed query to {tool_name}.")
+        return tool_mapping[tool_name].invoke({"query": query})
+
+    cached_call = cached_tool_call(query)
+    if cached_call:
+        tool_name, tool_input = cached_call
+        logger.info(f"Using cached routing decision {tool_name} "
+                    f"({llm_cache.stats()['hit_rate']:.0%} LLM cache hit rate).")
+        tool_result = tool_mapping[tool_name].invoke(tool_input)
+        if isinstance(tool_result, list):
+            tool_result = [img for img in tool_result if img]
+        return tool_result
+
     result = executor.invoke({"input": query})
 
     if "intermediate_steps" in result: 
         if result["intermediate_steps"]:
             logger.info("Using intermediate steps for tool result.")
+            action = result["intermediate_steps"][-1][0]
+            record_routing_decision(query, action.tool, action.tool_input)
             tool_result = result["intermediate_steps"][-1][1]
             if isinstance(tool_result, list):
                 tool_result = [img for img in tool_result if img]
             return tool_result
         else:
             tool_name = result.get("output", "").strip()
-            tool_mapping = {
-                "search_by_feature": search_by_feature,
-                "search_by_metadata": search_by_metadata,
-                "search_hybrid": search_hybrid,
-                "random_search": random_search
-            }
 
             logger.info("No intermediate steps found, using final tool call.")
             if tool_name in tool_mapping:
+                record_routing_decision(query, tool_name, {"query": query})
                 tool_result = tool_mapping[tool_name].invoke({"query": query})
                 return tool_result
 
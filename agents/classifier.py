@@ -0,0 +1,173 @@
+import os
+import json
+import logging
+import numpy as np
+from typing import Dict, List, Tuple
+
+from config.settings import Config
+from utils.clip_helper import clip_helper
+
+logger = logging.getLogger(__name__)
+
+# Labelled examples taken from the tool selector prompts in agents/prompts.py
+BOOTSTRAP_EXAMPLES = {
+    "search_by_metadata": [
+        "Find all paintings from 1950.",
+        "Show all laptops with 16GB RAM.",
+        "List dresses made with silk fabric.",
+        "Search gold necklaces made by Tanishq.",
+        "Show all paintings by Sheela Gowda.",
+        "Find artworks from 1992.",
+        "Search paintings made with oil on canvas.",
+        "List all works from the Modern & Contemporary Art department.",
+        "Fragile stencil mounted on white board.",
+        "Show me artworks created by M.F. Husain.",
+        "I want artworks made with oil on canvas.",
+        "Display all pieces in Modern & Contemporary Art department."
+    ],
+    "search_by_feature": [
+        "Paintings showing horses.",
+        "Shoes with red stripes.",
+        "Outfits with floral patterns.",
+        "Rings with diamond centerpiece.",
+        "Find paintings with blue backgrounds.",
+        "Show artworks that depict horses.",
+        "Search for abstract artworks with geometric patterns.",
+        "Sunset over mountains with orange sky"
+    ],
+    "search_hybrid": [
+        "Modern art sculptures from 2000s with abstract forms.",
+        "Nike shoes in black with white sole.",
+        "Silk sarees in pastel colors with embroidered borders.",
+        "Platinum rings with blue gemstones.",
+        "Find Sheela Gowda's paintings with a red background.",
+        "Show contemporary artworks that depict deities.",
+        "Search for 20th-century oil paintings of rural life."
+    ],
+    "random_search": [
+        "goigotod565",
+        "64864864",
+        "658695695pkfoeif",
+        "rjtreiojrioe",
+        "asdfghjk",
+        "random things with good vibes",
+        "make it pretty art wow"
+    ]
+}
+
+
+def load_query_log(path: str = None) -> List[Tuple[str, str]]:
+    """Read (query, tool) decisions recorded from the LLM router"""
+    path = path or Config.ROUTING_LOG_PATH
+    if not os.path.exists(path):
+        return []
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+                examples.append((entry["query"], entry["tool"]))
+            except (ValueError, KeyError):
+                continue
+    return examples
+
+
+def log_routing_decision(query: str, tool_name: str, path: str = None):
+    """Append an LLM routing decision to the labelled query log"""
+    path = path or Config.ROUTING_LOG_PATH
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"query": query, "tool": tool_name}) + "\n")
+    except OSError as e:
+        logger.warning(f"Failed to log routing decision: {e}")
+
+
+class ToolClassifier:
+    """Nearest-centroid tool router over normalized CLIP text embeddings"""
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self.centroids = np.zeros((0, Config.EMBEDDING_DIM), dtype="float32")
+
+    def fit(self, queries: List[str], labels: List[str]) -> "ToolClassifier":
+        embeddings = clip_helper.get_text_embeddings(queries)
+        self.labels = sorted(set(labels))
+        label_array = np.asarray(labels)
+        centroids = np.stack([embeddings[label_array == label].mean(axis=0) for label in self.labels])
+        self.centroids = (centroids / np.linalg.norm(centroids, axis=1, keepdims=True)).astype("float32")
+        return self
+
+    def predict_many(self, queries: List[str]) -> List[Tuple[str, float]]:
+        scores = clip_helper.get_text_embeddings(queries) @ self.centroids.T
+        best = scores.argmax(axis=1)
+        return [(self.labels[idx], float(scores[row, idx])) for row, idx in enumerate(best)]
+
+    def predict(self, query: str) -> str:
+        return self.predict_many([query])[0][0]
+
+    def evaluate(self, queries: List[str], labels: List[str]) -> Dict[str, object]:
+        """Agreement with reference labels (e.g. the LLM's decisions) plus a confusion table"""
+        predictions = [tool for tool, _ in self.predict_many(queries)] if queries else []
+        confusion: Dict[str, Dict[str, int]] = {}
+        for expected, predicted in zip(labels, predictions):
+            row = confusion.setdefault(expected, {})
+            row[predicted] = row.get(predicted, 0) + 1
+        correct = sum(expected == predicted for expected, predicted in zip(labels, predictions))
+        return {
+            "examples": len(labels),
+            "accuracy": correct / len(labels) if labels else 0.0,
+            "confusion": confusion
+        }
+
+    def save(self, path: str = None):
+        path = path or Config.ROUTING_CLASSIFIER_PATH
+        np.savez(path, labels=np.asarray(self.labels), centroids=self.centroids)
+
+    @classmethod
+    def load(cls, path: str = None) -> "ToolClassifier":
+        path = path or Config.ROUTING_CLASSIFIER_PATH
+        classifier = cls()
+        with np.load(path) as data:
+            classifier.labels = data["labels"].tolist()
+            classifier.centroids = data["centroids"].astype("float32")
+        return classifier
+
+
+def bootstrap_examples() -> Tuple[List[str], List[str]]:
+    queries, labels = [], []
+    for tool_name, examples in BOOTSTRAP_EXAMPLES.items():
+        queries.extend(examples)
+        labels.extend([tool_name] * len(examples))
+    return queries, labels
+
+
+def load_classifier() -> ToolClassifier:
+    """Load the saved classifier, or train one from the bootstrap examples and query log"""
+    if os.path.exists(Config.ROUTING_CLASSIFIER_PATH):
+        return ToolClassifier.load()
+    queries, labels = bootstrap_examples()
+    for query, tool_name in load_query_log():
+        queries.append(query)
+        labels.append(tool_name)
+    return ToolClassifier().fit(queries, labels)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    seed_queries, seed_labels = bootstrap_examples()
+    logged = load_query_log()
+
+    # Agreement with the LLM on its logged decisions, trained on the prompt examples alone
+    if logged:
+        report = ToolClassifier().fit(seed_queries, seed_labels).evaluate(
+            [query for query, _ in logged], [tool for _, tool in logged]
+        )
+        print(f"Agreement with LLM routing on {report['examples']} logged queries: {report['accuracy']:.1%}")
+        print(json.dumps(report["confusion"], indent=2))
+
+    final = ToolClassifier().fit(
+        seed_queries + [query for query, _ in logged],
+        seed_labels + [tool for _, tool in logged]
+    )
+    final.save()
+    print(f"Saved classifier trained on {len(seed_queries) + len(logged)} examples to {Config.ROUTING_CLASSIFIER_PATH}")
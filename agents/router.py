@@ -0,0 +1,147 @@
+import re
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from utils.vector_store import vector_store
+
+logger = logging.getLogger(__name__)
+
+# Material/technique terms the agent prompt already treats as metadata
+MEDIUM_KEYWORDS = {
+    "stencil", "board", "paper", "canvas", "wood", "fabric", "cardboard", "ink", "print", "metal",
+    "plastic", "acrylic", "oil", "watercolor", "watercolour", "gouache", "charcoal", "pigment",
+    "etching", "lithograph", "tempera", "pastel", "oil on canvas", "acrylic on canvas",
+    "ink on paper", "watercolour on paper", "watercolor on paper", "charcoal on paper"
+}
+
+# Keywords that name the support rather than the medium (metadata field paper_support)
+SUPPORT_KEYWORDS = {"board", "paper", "canvas", "wood", "cardboard"}
+
+# Words that don't change the intent of a metadata-only query ("paintings by X", "works from 1950")
+FILLER_WORDS = {
+    "show", "me", "find", "search", "list", "all", "the", "a", "an", "any", "some", "give",
+    "paintings", "painting", "artworks", "artwork", "works", "work", "art", "pieces", "piece",
+    "images", "image", "pictures", "by", "from", "of", "in", "made", "with", "on", "created", "done"
+}
+
+YEAR_PATTERN = re.compile(r"^(1[0-9]{3}|20[0-9]{2})(s|'s)?$")
+YEAR_RANGE_PATTERN = re.compile(r"^(1[0-9]{3}|20[0-9]{2})\s*(-|to)\s*(1[0-9]{3}|20[0-9]{2})$")
+
+# (tool name, metadata filter) chosen locally; (None, None) leaves the decision to the LLM
+Route = Tuple[Optional[str], Optional[Dict[str, Any]]]
+
+
+class QueryRouter:
+    """Local pre-router that picks a tool for obviously classifiable queries without the LLM
+
+    Routes pure years/decades, known artist names, known medium keywords and
+    unambiguous gibberish (only digit-bearing or vowel-less tokens); anything
+    else is left to the agent. Metadata routes carry the matched filter, so
+    the metadata search doesn't need the LLM to extract it either.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.routed: Dict[str, int] = {}
+        self._artists: Optional[Dict[str, Dict[str, Any]]] = None
+        self._mediums: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def keyword_metadata(keyword: str) -> Dict[str, Any]:
+        """Metadata filter for a MEDIUM_KEYWORDS entry, e.g. "oil on canvas" -> medium oil, support canvas"""
+        medium, _, support = keyword.partition(" on ")
+        if support:
+            return {"medium": medium, "paper_support": support}
+        if keyword in SUPPORT_KEYWORDS:
+            return {"paper_support": keyword}
+        return {"medium": keyword}
+
+    def refresh(self):
+        """Reload the artist and medium vocabularies from the indexed payloads"""
+        artists, mediums = {}, {}
+        for keyword in MEDIUM_KEYWORDS:
+            mediums[self.strip_filler(self.normalize(keyword))] = self.keyword_metadata(keyword)
+        for value in vector_store.payload_values("artist_name"):
+            for name in str(value).split("|"):
+                artists[self.strip_filler(self.normalize(name))] = {"artist_name": name.strip()}
+        for value in vector_store.payload_values("medium"):
+            mediums[self.strip_filler(self.normalize(str(value)))] = {"medium": str(value).strip()}
+        for vocabulary in (artists, mediums):
+            vocabulary.pop("unknown", None)
+            vocabulary.pop("", None)
+        with self._lock:
+            self._artists, self._mediums = artists, mediums
+        logger.info(f"Query router loaded {len(artists)} artists and {len(mediums)} mediums")
+
+    def _vocabularies(self):
+        if self._artists is None:
+            self.refresh()
+        return self._artists, self._mediums
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        text = re.sub(r"[^\w\s'.-]", " ", query.lower())
+        # Drop sentence-ending dots ("from 1950.") but keep initials inside names ("m.f husain")
+        return " ".join(re.sub(r"\.+(?=\s|$)", "", text).split())
+
+    @staticmethod
+    def strip_filler(text: str) -> str:
+        return " ".join(word for word in text.split() if word not in FILLER_WORDS)
+
+    @staticmethod
+    def is_gibberish(query: str) -> bool:
+        tokens = re.findall(r"\w+", query.lower())
+        if not tokens:
+            return True
+        for token in tokens:
+            if YEAR_PATTERN.match(token):
+                return False
+            if any(c.isdigit() for c in token):
+                continue
+            if len(token) > 3 and not re.search(r"[aeiouy]", token):
+                continue
+            return False
+        return True
+
+    def classify(self, query: str) -> Route:
+        """Return the tool and metadata filter for a clearly classifiable query, or (None, None) if the LLM should decide"""
+        normalized = self.normalize(query)
+        if self.is_gibberish(normalized):
+            return "random_search", None
+
+        core = self.strip_filler(normalized)
+        year = YEAR_PATTERN.match(core)
+        if year:
+            return "search_by_metadata", {"period": int(year.group(1))}
+        year_range = YEAR_RANGE_PATTERN.match(core)
+        if year_range:
+            return "search_by_metadata", {"period": [int(year_range.group(1)), int(year_range.group(3))]}
+
+        artists, mediums = self._vocabularies()
+        metadata = artists.get(core) or mediums.get(core)
+        if metadata:
+            return "search_by_metadata", dict(metadata)
+        return None, None
+
+    def route(self, query: str) -> Route:
+        tool_name, metadata = self.classify(query)
+        with self._lock:
+            self.total += 1
+            if tool_name:
+                self.routed[tool_name] = self.routed.get(tool_name, 0) + 1
+        return tool_name, metadata
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            handled = sum(self.routed.values())
+            return {
+                "queries": self.total,
+                "handled_locally": handled,
+                "handled_fraction": handled / self.total if self.total else 0.0,
+                "by_tool": dict(self.routed)
+            }
+
+
+query_router = QueryRouter()
@@ -1,6 +1,4 @@
-import os
 import logging
-import tempfile
 import streamlit as st
 from PIL import Image
 
@@ -8,10 +6,11 @@ st.set_page_config(page_title="Smart Image Search (Agent)", page_icon="🔍", la
 st.title("🔍 Smart Image Search Engine")
 
 from config.settings import Config
-from utils.helpers import validate_image
+from utils.helpers import load_uploaded_image
 from utils.ui_helpers import show_results
 from services.search_services import search_service
 from agents.agent_executor import initialize_agent, agent_search
+from utils.llm_client import warm_up_llm
 
 
 logger = logging.getLogger(__name__)
@@ -28,6 +27,8 @@ def initialize_app():
                     st.error("Failed to initialize search engine. Please check your image store.")
                     logger.error("Failed to build image index during initialization.")
                     return False
+        if Config.LLM_WARM_UP:
+            warm_up_llm()
         logger.info("Search API called successfully.")
         return True
     except Exception as e:
@@ -36,19 +37,17 @@ def initialize_app():
         return False
 
 
-def process_image_search(uploaded_file):
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".jpg") as temp_file:
-        temp_file.write(uploaded_file.read())
-        temp_path = temp_file.name
+@st.cache_resource
+def load_agent():
+    """Build the tool router once per process instead of on every rerun"""
+    return initialize_agent()
 
-    try:
-        query_image = Image.open(temp_path).convert("RGB")
-        with st.spinner("Searching by image..."):
-            results = search_service.search_by_image(query_image)
-            show_results([r["path"] for r in results])
-            logger.info(f"Image search returned {len(results)} results.")
-    finally:
-        os.unlink(temp_path)
+
+def process_image_search(query_image: Image.Image):
+    with st.spinner("Searching by image..."):
+        results = search_service.search_by_image(query_image)
+        st.session_state["results"] = [r["path"] for r in results]
+        logger.info(f"Image search returned {len(results)} results.")
 
 
 # ---- Streamlit Interface ----
@@ -57,7 +56,7 @@ def main():
     if not initialize_app():
         return
     
-    executor = initialize_agent()
+    executor = load_agent()
 
     query = st.text_input(
         "Enter your search (by description, artist, feature, etc):",
@@ -68,16 +67,22 @@ def main():
     left_col, middle_col, right_col = st.columns([1, 1, 1])
 
     if st.button("Search", type="primary"):
-        if uploaded_file and validate_image(uploaded_file):
+        st.session_state["results_page"] = 0
+        query_image = load_uploaded_image(uploaded_file)
+        if query_image:
             with middle_col:
                 st.image(uploaded_file, caption="Uploaded Image", width=300)
-            process_image_search(uploaded_file)
+            process_image_search(query_image)
         elif query:
             with st.spinner("Agent is analyzing and searching..."):
-                image_paths = agent_search(executor, query)
-                show_results(image_paths)
+                st.session_state["results"] = agent_search(executor, query)
         else:
             st.error("Please enter a search query or upload an image.")
+            st.session_state.pop("results", None)
+
+    # Results live in session state so paging reruns keep showing them
+    if "results" in st.session_state:
+        show_results(st.session_state["results"])
 
 
 if __name__ == "__main__":
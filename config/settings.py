@@ -4,27 +4,107 @@ from dotenv import load_dotenv
 load_dotenv()
 
 class Config:
+    # Vector Store Configuration ("qdrant" or the in-process "numpy" backend)
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "qdrant").lower()
+    NUMPY_STORE_PATH = os.getenv("NUMPY_STORE_PATH", "vector_store")
+
     # Qdrant Configuration
     QDRANT_HOST = os.getenv("QDRANT_HOST", "localhost")
     QDRANT_PORT = int(os.getenv("QDRANT_PORT", "6333"))
+    QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+    QDRANT_PREFER_GRPC = os.getenv("QDRANT_PREFER_GRPC", "false").lower() == "true"
     COLLECTION_NAME = os.getenv("COLLECTION_NAME", "image_embeddings")
     EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIMENSION_SIZE", "512"))
+    QDRANT_UPSERT_BATCH_SIZE = int(os.getenv("QDRANT_UPSERT_BATCH_SIZE", "64"))
+    QDRANT_UPSERT_PARALLEL = int(os.getenv("QDRANT_UPSERT_PARALLEL", "4"))
+    QDRANT_UPSERT_RETRIES = int(os.getenv("QDRANT_UPSERT_RETRIES", "3"))
     
     # API Configuration
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+    LLM_MODEL = os.getenv("LLM_MODEL", "openai/gpt-oss-20b")
+    LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+    LLM_RETRIES = int(os.getenv("LLM_RETRIES", "2"))
+    LLM_WARM_UP = os.getenv("LLM_WARM_UP", "true").lower() == "true"
+    LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+    LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+    LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
     CUMULUS_CLIENT_ID = os.getenv("CUMULUS_CLIENT_ID", "CUMULUS-IDCCG-PUB")
     CUMULUS_API_KEY = os.getenv("CUMULUS_API_KEY", "41204aed-89d7-4a45-9455-976ac475a8ab")
     
     # Model Configuration
     CLIP_MODEL_ID = os.getenv("CLIP_MODEL_ID", "openai/clip-vit-base-patch32")
     IMAGE_STORE_PATH = os.getenv("IMAGE_STORE_PATH", "image_store")
+    CLIP_BACKEND = os.getenv("CLIP_BACKEND", "torch").lower()  # "torch" or "onnx"
+    ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx_models")
+    CLIP_QUANTIZE = os.getenv("CLIP_QUANTIZE", "false").lower() == "true"
+    CLIP_IMAGE_SIZE = int(os.getenv("CLIP_IMAGE_SIZE", "224"))
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+    TEXT_EMBEDDING_CACHE_SIZE = int(os.getenv("TEXT_EMBEDDING_CACHE_SIZE", "1024"))
+
+    # Ingestion Configuration
+    INGEST_DOWNLOAD_WORKERS = int(os.getenv("INGEST_DOWNLOAD_WORKERS", "8"))
+    INGEST_DECODE_WORKERS = int(os.getenv("INGEST_DECODE_WORKERS", "2"))
+    INGEST_UPSERT_BATCH_SIZE = int(os.getenv("INGEST_UPSERT_BATCH_SIZE", "256"))
+    INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "64"))
+    INDEX_MANIFEST_PATH = os.getenv("INDEX_MANIFEST_PATH", "index_manifest.sqlite3")
+    INDEX_CHECK_CONTENT = os.getenv("INDEX_CHECK_CONTENT", "true").lower() == "true"
     
     # Search Configuration
+    QUERY_ROUTER_ENABLED = os.getenv("QUERY_ROUTER_ENABLED", "true").lower() == "true"
+    ROUTING_BACKEND = os.getenv("ROUTING_BACKEND", "llm").lower()  # "llm" or "classifier"
+    ROUTING_CLASSIFIER_PATH = os.getenv("ROUTING_CLASSIFIER_PATH", "routing_classifier.npz")
+    ROUTING_LOG_ENABLED = os.getenv("ROUTING_LOG_ENABLED", "true").lower() == "true"
+    ROUTING_LOG_PATH = os.getenv("ROUTING_LOG_PATH", "routing_log.jsonl")
     DEFAULT_TOP_K = 2000
     IMAGE_TOP_K = 10000
     SIMILARITY_THRESHOLD = 0.2
     IMAGE_SIMILARITY_THRESHOLD = 0.75
+
+    # Collection tuning profiles: HNSW graph, search-time ef, int8 scalar
+    # quantization (rescored against the original vectors) and vector storage.
+    # An empty profile keeps Qdrant's defaults.
+    COLLECTION_PROFILE = os.getenv("COLLECTION_PROFILE", "default")
+    COLLECTION_PROFILES = {
+        "default": {},
+        "low-latency": {
+            "m": 16, "ef_construct": 128, "hnsw_ef": 64,
+            "quantization": True, "oversampling": 1.5, "on_disk": False
+        },
+        "low-memory": {
+            "m": 8, "ef_construct": 100, "hnsw_ef": 64,
+            "quantization": True, "oversampling": 2.0, "on_disk": True
+        },
+        "high-recall": {
+            "m": 32, "ef_construct": 256, "hnsw_ef": 256,
+            "quantization": False, "on_disk": False
+        }
+    }
     
+    # HTTP Configuration (shared session used for image fetching)
+    HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "8"))
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "32"))
+    HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+    HTTP_BACKOFF_FACTOR = float(os.getenv("HTTP_BACKOFF_FACTOR", "0.3"))
+
+    # Image Cache Configuration
+    IMAGE_CACHE_ENABLED = os.getenv("IMAGE_CACHE_ENABLED", "true").lower() == "true"
+    IMAGE_CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", ".image_cache")
+    IMAGE_CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+    IMAGE_CACHE_TTL = int(os.getenv("IMAGE_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Results Grid Configuration
+    RESULTS_PAGE_SIZE = int(os.getenv("RESULTS_PAGE_SIZE", "24"))
+    RESULTS_PREFETCH_WORKERS = int(os.getenv("RESULTS_PREFETCH_WORKERS", "4"))
+    RESULTS_IMAGE_WORKERS = int(os.getenv("RESULTS_IMAGE_WORKERS", "8"))
+    RESULTS_IMAGE_TIMEOUT = float(os.getenv("RESULTS_IMAGE_TIMEOUT", "8"))
+
+    # Thumbnail Configuration
+    THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", ".thumbnails")
+    THUMBNAIL_SIZE = int(os.getenv("THUMBNAIL_SIZE", "384"))
+    THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+    THUMBNAILS_AT_INGEST = os.getenv("THUMBNAILS_AT_INGEST", "true").lower() == "true"
+
     # URLs
     OAUTH_URL = "https://accounts.cumulus.co.in/oauth/token"
     SEARCH_API_URL = "https://srcapi.cumulus.co.in/api/public_hook/v1/artwork/"
@@ -37,4 +117,6 @@ class Config:
             required_vars.append("GROQ_API_KEY")
         if required_vars:
             raise ValueError(f"Missing required environment variables: {', '.join(required_vars)}")
+        if cls.COLLECTION_PROFILE not in cls.COLLECTION_PROFILES:
+            raise ValueError(f"Unknown COLLECTION_PROFILE '{cls.COLLECTION_PROFILE}', expected one of: {', '.join(cls.COLLECTION_PROFILES)}")
         return True
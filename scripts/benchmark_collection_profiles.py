@@ -0,0 +1,108 @@
+"""Measure recall@k and search latency of each collection tuning profile.
+
+Usage: python -m scripts.benchmark_collection_profiles [k] [queries]
+Copies the vectors of the indexed collection into one throwaway collection per
+profile in Config.COLLECTION_PROFILES. Recall is measured against exact
+(brute-force) search on the original collection, using indexed vectors as queries.
+The throwaway collections use tiny indexing and full-scan thresholds so the HNSW
+graph and quantized segments are built and used even for a catalogue of a few
+hundred points, and
+timing starts only once the optimizer has finished (collection status green).
+"""
+import sys
+import time
+import numpy as np
+from qdrant_client.models import PointStruct, SearchParams, OptimizersConfigDiff, CollectionStatus, HnswConfigDiff
+
+from config.settings import Config
+from utils.qdrant_helper import qdrant_helper, build_collection_config, build_search_params
+
+SCROLL_BATCH = 1000
+# Qdrant's default indexing and full-scan thresholds (20,000 / 10,000 KB, i.e.
+# thousands of 512-dim vectors) would leave a small corpus in plain segments
+# searched by full scan, so every profile would measure the same thing
+INDEXING_THRESHOLD_KB = 10
+FULL_SCAN_THRESHOLD_KB = 1
+OPTIMIZER_TIMEOUT = 300
+
+
+def load_corpus():
+    points, offset = [], None
+    while True:
+        batch, offset = qdrant_helper.client.scroll(
+            collection_name=qdrant_helper.collection_name,
+            limit=SCROLL_BATCH,
+            offset=offset,
+            with_vectors=True,
+            with_payload=False
+        )
+        points.extend(batch)
+        if offset is None:
+            return points
+
+
+def search_ids(collection_name: str, query: list, k: int, params) -> list:
+    response = qdrant_helper.client.query_points(
+        collection_name=collection_name,
+        query=query,
+        limit=k,
+        search_params=params,
+        with_payload=False
+    )
+    return [point.id for point in response.points]
+
+
+def wait_until_optimized(collection_name: str, timeout: float = OPTIMIZER_TIMEOUT):
+    """Block until the optimizer has built the index for the collection"""
+    deadline = time.monotonic() + timeout
+    while qdrant_helper.client.get_collection(collection_name).status != CollectionStatus.GREEN:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Collection '{collection_name}' was not optimized within {timeout}s")
+        time.sleep(0.5)
+
+
+def main(k: int = 10, num_queries: int = 200):
+    client = qdrant_helper.client
+    corpus = load_corpus()
+    rng = np.random.default_rng(0)
+    query_points = [corpus[i] for i in rng.choice(len(corpus), size=min(num_queries, len(corpus)), replace=False)]
+    exact = SearchParams(exact=True)
+    truth = [set(search_ids(qdrant_helper.collection_name, p.vector, k, exact)) for p in query_points]
+    print(f"{len(corpus)} points, {len(query_points)} queries, k={k}")
+
+    for name, profile in Config.COLLECTION_PROFILES.items():
+        collection_name = f"{qdrant_helper.collection_name}_profile_{name.replace('-', '_')}"
+        if client.collection_exists(collection_name):
+            client.delete_collection(collection_name)
+        config = build_collection_config(profile, qdrant_helper.embedding_dim)
+        hnsw_config = config.get("hnsw_config") or HnswConfigDiff()
+        config["hnsw_config"] = hnsw_config.model_copy(update={"full_scan_threshold": FULL_SCAN_THRESHOLD_KB})
+        client.create_collection(
+            collection_name=collection_name,
+            optimizers_config=OptimizersConfigDiff(indexing_threshold=INDEXING_THRESHOLD_KB),
+            **config
+        )
+        for start in range(0, len(corpus), SCROLL_BATCH):
+            client.upsert(
+                collection_name=collection_name,
+                points=[PointStruct(id=p.id, vector=p.vector) for p in corpus[start:start + SCROLL_BATCH]],
+                wait=True
+            )
+        wait_until_optimized(collection_name)
+
+        params = build_search_params(profile)
+        latencies, recalls = [], []
+        for point, expected in zip(query_points, truth):
+            started = time.perf_counter()
+            found = search_ids(collection_name, point.vector, k, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+            recalls.append(len(expected & set(found)) / k)
+
+        client.delete_collection(collection_name)
+        print(f"{name:12} recall@{k} {np.mean(recalls):.4f}   "
+              f"p50 {np.median(latencies):7.2f} ms   p95 {np.percentile(latencies, 95):7.2f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
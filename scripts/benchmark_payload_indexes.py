@@ -0,0 +1,58 @@
+"""Measure filtered-query latency with and without the metadata payload indexes.
+
+Usage: python -m scripts.benchmark_payload_indexes [repeats]
+Runs against the collection configured in .env, which must already be indexed.
+"""
+import sys
+import time
+import logging
+import numpy as np
+
+from utils.qdrant_helper import qdrant_helper, PAYLOAD_INDEXES
+
+FILTERS = [
+    {"period": 1900},
+    {"medium": "oil"},
+    {"artist_name": "husain"},
+    {"department": "modern"},
+    {"paper_support": "canvas", "period": 1950}
+]
+
+
+def measure(repeats: int) -> dict:
+    rng = np.random.default_rng(0)
+    timings = {}
+    for metadata_json in FILTERS:
+        samples = []
+        for _ in range(repeats):
+            query_vector = rng.standard_normal(qdrant_helper.embedding_dim).astype("float32")
+            started = time.perf_counter()
+            qdrant_helper.metadata_based_searching(query_vector.tolist(), metadata_json, limit=100)
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[str(metadata_json)] = (np.median(samples), np.percentile(samples, 95))
+    return timings
+
+
+def drop_indexes():
+    for field_name in PAYLOAD_INDEXES:
+        qdrant_helper.client.delete_payload_index(qdrant_helper.collection_name, field_name, wait=True)
+
+
+def main(repeats: int = 50):
+    logging.basicConfig(level=logging.WARNING)
+    print(f"Collection '{qdrant_helper.collection_name}' with {qdrant_helper.count_points()} points")
+
+    drop_indexes()
+    before = measure(repeats)
+    qdrant_helper.create_payload_indexes()
+    after = measure(repeats)
+
+    print(f"{'filter':45} {'no index p50/p95 ms':>22} {'indexed p50/p95 ms':>22}")
+    for key in before:
+        b50, b95 = before[key]
+        a50, a95 = after[key]
+        print(f"{key:45} {b50:10.2f} /{b95:9.2f} {a50:10.2f} /{a95:9.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50)
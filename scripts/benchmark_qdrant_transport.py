@@ -0,0 +1,70 @@
+"""Compare upsert and search throughput of the Qdrant REST and gRPC transports.
+
+Usage: python -m scripts.benchmark_qdrant_transport [points] [queries]
+Uses a throwaway collection on the Qdrant instance configured in .env.
+"""
+import sys
+import time
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import VectorParams, Distance, PointStruct
+
+from config.settings import Config
+
+BENCH_COLLECTION = "transport_benchmark"
+UPSERT_BATCH = 256
+
+
+def run(prefer_grpc: bool, vectors: np.ndarray, queries: np.ndarray) -> dict:
+    client = QdrantClient(
+        host=Config.QDRANT_HOST,
+        port=Config.QDRANT_PORT,
+        grpc_port=Config.QDRANT_GRPC_PORT,
+        prefer_grpc=prefer_grpc
+    )
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+    client.create_collection(
+        collection_name=BENCH_COLLECTION,
+        vectors_config=VectorParams(size=vectors.shape[1], distance=Distance.COSINE)
+    )
+
+    started = time.perf_counter()
+    for start in range(0, len(vectors), UPSERT_BATCH):
+        batch = vectors[start:start + UPSERT_BATCH]
+        client.upsert(
+            collection_name=BENCH_COLLECTION,
+            points=[
+                PointStruct(id=start + i, vector=vector.tolist(), payload={"index": start + i})
+                for i, vector in enumerate(batch)
+            ],
+            wait=True
+        )
+    upsert_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for query in queries:
+        client.query_points(collection_name=BENCH_COLLECTION, query=query.tolist(), limit=100, with_vectors=True)
+    search_seconds = time.perf_counter() - started
+
+    client.delete_collection(BENCH_COLLECTION)
+    return {
+        "upsert_points_per_s": len(vectors) / upsert_seconds,
+        "search_queries_per_s": len(queries) / search_seconds
+    }
+
+
+def main(num_points: int = 20000, num_queries: int = 500):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_points, Config.EMBEDDING_DIM)).astype("float32")
+    queries = rng.standard_normal((num_queries, Config.EMBEDDING_DIM)).astype("float32")
+
+    for name, prefer_grpc in (("rest", False), ("grpc", True)):
+        result = run(prefer_grpc, vectors, queries)
+        print(f"{name:5} upsert {result['upsert_points_per_s']:10.0f} points/s   "
+              f"search {result['search_queries_per_s']:8.1f} queries/s")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*args)
@@ -0,0 +1,232 @@
+import time
+import queue
+import hashlib
+import logging
+import threading
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from PIL import Image
+from qdrant_client.models import PointStruct
+
+from config.settings import Config
+from utils.clip_helper import clip_helper
+from utils.vector_store import vector_store
+from utils.helpers import fetch_image, decode_image, save_thumbnail
+
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream on a stage queue
+_DONE = object()
+
+# (point id, image path, payload)
+Record = Tuple[Any, str, Dict[str, Any]]
+
+
+class StageStats:
+    """Thread-safe throughput counters for one pipeline stage"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, count: int, seconds: float, failed: int = 0):
+        with self._lock:
+            self.processed += count
+            self.failed += failed
+            self.busy_seconds += seconds
+
+    def as_dict(self, elapsed: float) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "processed": self.processed,
+                "failed": self.failed,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "items_per_second": round(self.processed / elapsed, 2) if elapsed > 0 else 0.0
+            }
+
+
+class IngestionPipeline:
+    """Staged producer/consumer pipeline: download -> decode -> embed -> upsert
+
+    Each stage runs on its own threads and hands work to the next through a
+    bounded queue, so a slow stage blocks the ones feeding it instead of
+    letting downloaded images pile up in memory.
+    """
+
+    def __init__(self, download_workers: int = None, decode_workers: int = None,
+                 embed_batch_size: int = None, upsert_batch_size: int = None,
+                 queue_size: int = None,
+                 fetch: Callable[[str], Tuple[bytes, Dict[str, Optional[str]]]] = fetch_image,
+                 decode: Callable[[bytes], Image.Image] = None,
+                 embed: Callable[[List[Image.Image]], Any] = None,
+                 upsert: Callable[[List[PointStruct]], bool] = None,
+                 on_upserted: Callable[[List[PointStruct], Dict[Any, str], Dict[Any, Dict[str, Optional[str]]]], None] = None,
+                 thumbnails: bool = None):
+        self.download_workers = download_workers or Config.INGEST_DOWNLOAD_WORKERS
+        self.decode_workers = decode_workers or Config.INGEST_DECODE_WORKERS
+        self.embed_batch_size = embed_batch_size or Config.EMBEDDING_BATCH_SIZE
+        self.upsert_batch_size = upsert_batch_size or Config.INGEST_UPSERT_BATCH_SIZE
+        self.queue_size = queue_size or Config.INGEST_QUEUE_SIZE
+        self.fetch = fetch
+        self.thumbnails = Config.THUMBNAILS_AT_INGEST if thumbnails is None else thumbnails
+        # CLIP only needs its input resolution; keep enough pixels for the thumbnail tier too
+        target_size = max(Config.CLIP_IMAGE_SIZE, Config.THUMBNAIL_SIZE if self.thumbnails else 0)
+        self.decode = decode or partial(decode_image, target_size=target_size)
+        self.embed = embed or clip_helper.get_image_embeddings
+        self.upsert = upsert or vector_store.upsert_points
+        self.on_upserted = on_upserted
+
+        self.stats = {name: StageStats(name) for name in ("download", "decode", "embed", "upsert")}
+        self.indexed_ids: List[Any] = []
+        self.content_hashes: Dict[Any, str] = {}
+        self.validators: Dict[Any, Dict[str, Optional[str]]] = {}
+        self._elapsed = 0.0
+
+    def run(self, records: Iterable[Record]) -> List[Any]:
+        """Push records through every stage and return the ids that were upserted"""
+        record_queue = queue.Queue(maxsize=self.queue_size)
+        download_queue = queue.Queue(maxsize=self.queue_size)
+        decode_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+
+        downloaders = [
+            threading.Thread(target=self._download_worker, args=(record_queue, download_queue), daemon=True)
+            for _ in range(self.download_workers)
+        ]
+        decoders = [
+            threading.Thread(target=self._decode_worker, args=(download_queue, decode_queue), daemon=True)
+            for _ in range(self.decode_workers)
+        ]
+        embedder = threading.Thread(target=self._embed_worker, args=(decode_queue, write_queue), daemon=True)
+        writer = threading.Thread(target=self._write_worker, args=(write_queue,), daemon=True)
+
+        started = time.perf_counter()
+        for thread in downloaders + decoders + [embedder, writer]:
+            thread.start()
+
+        for record in records:
+            record_queue.put(record)
+        for _ in downloaders:
+            record_queue.put(_DONE)
+
+        for thread in downloaders:
+            thread.join()
+        for _ in decoders:
+            download_queue.put(_DONE)
+        for thread in decoders:
+            thread.join()
+        decode_queue.put(_DONE)
+        embedder.join()
+        writer.join()
+
+        self._elapsed = time.perf_counter() - started
+        logger.info(f"Ingestion pipeline finished in {self._elapsed:.2f}s: {self.report()}")
+        return self.indexed_ids
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage throughput counters for the last run"""
+        return {name: stats.as_dict(self._elapsed) for name, stats in self.stats.items()}
+
+    def _download_worker(self, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            record = inbox.get()
+            if record is _DONE:
+                return
+            point_id, path, payload = record
+            started = time.perf_counter()
+            try:
+                data, validators = self.fetch(path)
+            except Exception as e:
+                self.stats["download"].record(0, time.perf_counter() - started, failed=1)
+                logger.warning(f"Failed to download image {path}: {e}")
+                continue
+            self.content_hashes[point_id] = hashlib.sha256(data).hexdigest()
+            self.validators[point_id] = validators
+            self.stats["download"].record(1, time.perf_counter() - started)
+            outbox.put((point_id, path, payload, data))
+
+    def _decode_worker(self, inbox: queue.Queue, outbox: queue.Queue):
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            point_id, path, payload, data = item
+            started = time.perf_counter()
+            try:
+                image = self.decode(data)
+            except Exception as e:
+                self.stats["decode"].record(0, time.perf_counter() - started, failed=1)
+                logger.warning(f"Failed to decode image for id {point_id}: {e}")
+                continue
+            if self.thumbnails:
+                # A missing thumbnail is regenerated on first display; never drop the record for it
+                try:
+                    save_thumbnail(path, image)
+                except Exception as e:
+                    logger.warning(f"Failed to save thumbnail for id {point_id}: {e}")
+            self.stats["decode"].record(1, time.perf_counter() - started)
+            outbox.put((point_id, payload, image))
+
+    def _embed_worker(self, inbox: queue.Queue, outbox: queue.Queue):
+        batch = []
+        while True:
+            item = inbox.get()
+            if item is not _DONE:
+                batch.append(item)
+            if batch and (item is _DONE or len(batch) >= self.embed_batch_size):
+                self._embed_batch(batch, outbox)
+                batch = []
+            if item is _DONE:
+                outbox.put(_DONE)
+                return
+
+    def _embed_batch(self, batch: List[Tuple[Any, Dict[str, Any], Image.Image]], outbox: queue.Queue):
+        started = time.perf_counter()
+        try:
+            embeddings = self.embed([image for _, _, image in batch])
+        except Exception as e:
+            self.stats["embed"].record(0, time.perf_counter() - started, failed=len(batch))
+            logger.error(f"Error embedding batch of {len(batch)} images: {e}")
+            return
+        failed = 0
+        for (point_id, payload, _), embedding in zip(batch, embeddings):
+            if not embedding.any():
+                failed += 1
+                logger.warning(f"Skipping data : empty embedding for id {point_id}")
+                continue
+            outbox.put(PointStruct(id=point_id, vector=embedding.tolist(), payload=payload))
+        self.stats["embed"].record(len(batch) - failed, time.perf_counter() - started, failed=failed)
+
+    def _write_worker(self, inbox: queue.Queue):
+        batch = []
+        while True:
+            item = inbox.get()
+            if item is not _DONE:
+                batch.append(item)
+            if batch and (item is _DONE or len(batch) >= self.upsert_batch_size):
+                self._write_batch(batch)
+                batch = []
+            if item is _DONE:
+                return
+
+    def _write_batch(self, batch: List[PointStruct]):
+        started = time.perf_counter()
+        try:
+            success = self.upsert(batch)
+        except Exception as e:
+            logger.error(f"Error upserting batch of {len(batch)} points: {e}")
+            success = False
+        if success:
+            self.indexed_ids.extend(point.id for point in batch)
+            if self.on_upserted:
+                try:
+                    self.on_upserted(batch, self.content_hashes, self.validators)
+                except Exception as e:
+                    logger.error(f"Error in upsert callback: {e}")
+            self.stats["upsert"].record(len(batch), time.perf_counter() - started)
+        else:
+            self.stats["upsert"].record(0, time.perf_counter() - started, failed=len(batch))
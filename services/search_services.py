@@ -3,19 +3,23 @@ import os
 import glob
 import json
 import logging
+import numpy as np
 import streamlit as st
 from PIL import Image
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 from datetime import datetime
-from qdrant_client.models import PointStruct
-from langchain_groq import ChatGroq
 
 from config.settings import Config
-from utils.qdrant_helper import qdrant_helper
+from utils.vector_store import vector_store
 from utils.clip_helper import clip_helper
 from endpoints.api_endpoints import api_client
-from utils.helpers import load_image_from_path
+from utils.helpers import image_changed
+from utils.index_manifest import IndexManifest
+from utils.llm_cache import llm_cache
+from utils.llm_client import get_llm
+from services.ingestion_pipeline import IngestionPipeline
 from agents.prompts import metadata_system_prompt
 
 
@@ -53,73 +57,119 @@ class SearchService:
         return val.lower() if isinstance(val, str) else "unknown"
 
 
-    def store_sample_metadata(self) -> List[str]:
-        points = []
-
-        # from api_sample_data import sample_data
-        search_query = ["Maharaja", "Mountains", "Tribal Art of India", "Photographs", "Baua Devi", "Flower", "Fruit", "Ancient Artwork", "Colonial period", "Saint", "Fashion", "British Rule", "Car"]
-
-        logger.info("Initiated - Data Injection")
+    def build_payload(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten one Cumulus artwork record into a Qdrant payload"""
+        period_start, period_end = self.get_single_range(data.get("period", "unknown"))
+        artists = data.get("artists", [])
+        artist_bios = [self.safe_lower(artist.get("bio") or "unknown") for artist in artists]
+        artist_names = [self.safe_lower(artist.get("name") or "unknown") for artist in artists]
+
+        return {
+            "id": data.get("id", "unknown"),
+            "date": data.get("date", "unknown"),
+            "accession_number": data.get("accession_number", "unknown"),
+            "medium": self.safe_lower(data.get("medium") or "unknown"),
+            "dimensions": data.get("dimensions", "unknown"),
+            "status": data.get("status", "unknown"),
+            "public_access": data.get("public_access", "unknown"),
+            "path": data.get("primary_image", "unknown"),
+            "instance_id": data.get("instance_id", "unknown"),
+            "title": data.get("title", "unknown"),
+            "department_id": data.get("department_id", "unknown"),
+            "department": self.safe_lower(data.get("department") or "unknown"),
+            "period_start": period_start,
+            "period_end": period_end,
+            "signed": data.get("signed", "unknown"),
+            "keywords": data.get("keywords", "unknown"),
+            "condition": data.get("condition", "unknown"),
+            "inscribed": data.get("inscribed", "unknown"),
+            "paper_support": self.safe_lower(data.get("paper_support") or "unknown"),
+            "attributes": data.get("attributes", "unknown"),
+            # "artist_bio": artist_bios,
+            "artist_bio": " | ".join(artist_bios) if artist_bios else "unknown",
+            # "artist_name": artist_names,
+            "artist_name": " | ".join(artist_names) if artist_names else "unknown"
+        }
+
+
+    def fetch_sample_records(self, search_query: List[str]) -> List[Tuple[Any, str, Dict[str, Any]]]:
+        """Fetch artworks for each query from the API as (id, image path, payload) records"""
+        records = {}
         for query in search_query:
-            response = api_client.search_by_api(query).json()        
-            data_dict = response["results"]["data"]
+            response = api_client.search_by_api(query)
+            if response is None:
+                logger.warning(f"Skipping query '{query}': API search failed")
+                continue
+            data_dict = response.json()["results"]["data"]
             logger.info(f"Fetching Data...")
-            for idx, data in enumerate(data_dict):
+            for data in data_dict:
                 try:
-                    period_start, period_end = self.get_single_range(data.get("period", "unknown"))
-                    artists = data.get("artists", [])
-                    artist_bios = [self.safe_lower(artist.get("bio") or "unknown") for artist in artists]
-                    artist_names = [self.safe_lower(artist.get("name") or "unknown") for artist in artists]
-
-
-                    dict_data = {
-                        "id": data.get("id", "unknown"),
-                        "date": data.get("date", "unknown"),
-                        "accession_number": data.get("accession_number", "unknown"),
-                        "medium": self.safe_lower(data.get("medium") or "unknown"),
-                        "dimensions": data.get("dimensions", "unknown"),
-                        "status": data.get("status", "unknown"),
-                        "public_access": data.get("public_access", "unknown"),
-                        "path": data.get("primary_image", "unknown"),
-                        "instance_id": data.get("instance_id", "unknown"),
-                        "title": data.get("title", "unknown"),
-                        "department_id": data.get("department_id", "unknown"),
-                        "department": self.safe_lower(data.get("department") or "unknown"),
-                        "period_start": period_start,
-                        "period_end": period_end,
-                        "signed": data.get("signed", "unknown"),
-                        "keywords": data.get("keywords", "unknown"),
-                        "condition": data.get("condition", "unknown"),
-                        "inscribed": data.get("inscribed", "unknown"),
-                        "paper_support": self.safe_lower(data.get("paper_support") or "unknown"),
-                        "attributes": data.get("attributes", "unknown"),
-                        # "artist_bio": artist_bios,
-                        "artist_bio": " | ".join(artist_bios) if artist_bios else "unknown",
-                        # "artist_name": artist_names,
-                        "artist_name": " | ".join(artist_names) if artist_names else "unknown"
-                    }
-
-                    image = load_image_from_path(data["primary_image"])
-                    if image:
-                        embedding = clip_helper.get_image_embedding(image)
-                        points.append(
-                            PointStruct(
-                                id=data["id"],
-                                vector=embedding.tolist(),
-                                payload=dict_data
-                            )
-                        )
+                    if data["id"] not in records:
+                        records[data["id"]] = (data["id"], data["primary_image"], self.build_payload(data))
                 except Exception as e:
                     logger.warning(f"Skipping data : {e}")
-    
-            if points:
-                success = qdrant_helper.upsert_points(points)
-                if success:
-                    self.is_indexed = True
-                    logger.info(f"Successfully indexed {len(points)} images")
-            points = []
+        return list(records.values())
+
+
+    def find_replaced_images(self, manifest: IndexManifest, records: Iterable[Tuple[Any, str, Dict[str, Any]]]) -> List[Any]:
+        """Ids of indexed artworks whose image was replaced at the same URL
+
+        Each image is revalidated with a conditional request against the ETag /
+        Last-Modified stored when it was indexed, so unchanged images cost a 304
+        and no download. Artworks without stored validators are not checked.
+        """
+        def changed(record):
+            point_id, path, _ = record
+            entry = manifest.get(point_id) or {}
+            return image_changed(path, entry.get("etag"), entry.get("last_modified"), entry.get("content_hash"))
+
+        records = list(records)
+        with ThreadPoolExecutor(max_workers=Config.INGEST_DOWNLOAD_WORKERS) as executor:
+            flags = list(executor.map(changed, records))
+        replaced = [record[0] for record, flag in zip(records, flags) if flag]
+        if replaced:
+            logger.info(f"{len(replaced)} indexed images changed at their source and will be re-embedded")
+        return replaced
+
+
+    def store_sample_metadata(self, force_rebuild: bool = False) -> List[str]:
+        # from api_sample_data import sample_data
+        search_query = ["Maharaja", "Mountains", "Tribal Art of India", "Photographs", "Baua Devi", "Flower", "Fruit", "Ancient Artwork", "Colonial period", "Saint", "Fashion", "British Rule", "Car"]
+
+        logger.info("Initiated - Data Injection")
+        manifest = IndexManifest()
+        if force_rebuild or (manifest.count() and not vector_store.count_points()):
+            manifest.clear()
+
+        records = self.fetch_sample_records(search_query)
+        current = {}
+        pending = {}
+        for point_id, path, payload in records:
+            if manifest.is_current(point_id, path, payload):
+                current[point_id] = (point_id, path, payload)
+            else:
+                pending[point_id] = (point_id, path, payload)
+        if Config.INDEX_CHECK_CONTENT:
+            for point_id in self.find_replaced_images(manifest, current.values()):
+                pending[point_id] = current.pop(point_id)
+        current_ids = list(current)
+        logger.info(f"{len(current_ids)} artworks unchanged, {len(pending)} to index")
+
+        def record_indexed(points, content_hashes, validators):
+            manifest.mark_indexed([
+                (point.id, pending[point.id][1], pending[point.id][2], content_hashes.get(point.id),
+                 validators.get(point.id, {}))
+                for point in points
+            ])
+
+        pipeline = IngestionPipeline(on_upserted=record_indexed)
+        indexed_ids = pipeline.run(pending.values()) if pending else []
+        if indexed_ids:
+            logger.info(f"Successfully indexed {len(indexed_ids)} images")
+        if indexed_ids or current_ids:
+            self.is_indexed = True
         logger.info("Completed - Data Injection")
-        return points
+        return current_ids + indexed_ids
 
 
     @st.cache_resource
@@ -130,14 +180,14 @@ class SearchService:
             
         try:
             # Create collection
-            if not qdrant_helper.create_collection():
+            if not vector_store.create_collection():
                 return False
             
             ##################################
             ## Store sample metadata points ##
             ##################################
             # points = _self.store_sample_metadata()
-            success = _self.store_sample_metadata()
+            success = _self.store_sample_metadata(force_rebuild=force_rebuild)
 
             # #######################################
             # # Store data from image_store folder ##
@@ -192,7 +242,7 @@ class SearchService:
             
             text_embedding = clip_helper.get_text_embedding(query)
             
-            results = qdrant_helper.search_vectors(
+            results = vector_store.search_vectors(
                 query_vector=text_embedding.tolist(),
                 limit=Config.DEFAULT_TOP_K,
                 score_threshold=Config.SIMILARITY_THRESHOLD
@@ -204,6 +254,51 @@ class SearchService:
             return []
     
 
+    def search_by_features(self, queries: List[str]) -> List[List[str]]:
+        """Search images for several text queries with one batched Qdrant request"""
+        try:
+            if not self.is_indexed:
+                if not self.build_image_index():
+                    return [[] for _ in queries]
+
+            text_embeddings = clip_helper.get_text_embeddings(queries)
+
+            results = vector_store.search_many(
+                query_vectors=text_embeddings.tolist(),
+                limit=Config.DEFAULT_TOP_K,
+                score_threshold=Config.SIMILARITY_THRESHOLD
+            )
+
+            return [[result["payload"]["path"] for result in hits] for hits in results]
+        except Exception as e:
+            logger.error(f"Error in batch text search: {e}")
+            return [[] for _ in queries]
+
+
+    def search_by_images(self, images: List[Image.Image]) -> List[List[Dict[str, Any]]]:
+        """Find similar images for several query images with one batched Qdrant request"""
+        try:
+            if not self.is_indexed:
+                if not self.build_image_index():
+                    return [[] for _ in images]
+
+            image_embeddings = clip_helper.get_image_embeddings(images)
+
+            results = vector_store.search_many(
+                query_vectors=image_embeddings.tolist(),
+                limit=Config.IMAGE_TOP_K,
+                score_threshold=Config.IMAGE_SIMILARITY_THRESHOLD
+            )
+
+            return [[{
+                "path": result["payload"].get("path"),
+                "score": result["score"]
+            } for result in hits] for hits in results]
+        except Exception as e:
+            logger.error(f"Error in batch image search: {e}")
+            return [[] for _ in images]
+
+
     def search_by_image(self, image: Image.Image) -> List[Dict[str, Any]]:
         """Search similar images using image query"""
         try:
@@ -213,7 +308,7 @@ class SearchService:
             
             image_embedding = clip_helper.get_image_embedding(image)
             
-            result = qdrant_helper.query_points(
+            result = vector_store.query_points(
                 query=image_embedding.tolist(),
                 limit=Config.IMAGE_TOP_K,
                 score_threshold=Config.IMAGE_SIMILARITY_THRESHOLD,
@@ -248,12 +343,7 @@ class SearchService:
  
 
     def initialize_llm(self):
-        llm = ChatGroq(
-            model="openai/gpt-oss-20b",
-            temperature=0,
-            api_key=Config.GROQ_API_KEY
-        )
-        return llm
+        return get_llm()
 
 
     def create_metadata(self, query: str) -> List[str]:
@@ -261,29 +351,45 @@ class SearchService:
             ("system", metadata_system_prompt),
             ("human", query),
         ]
+        response = llm_cache.get(query, metadata_system_prompt, Config.LLM_MODEL) if Config.LLM_CACHE_ENABLED else None
+        if response is not None:
+            logger.info(f"Using cached metadata ({llm_cache.stats()['hit_rate']:.0%} LLM cache hit rate).")
+            return json.loads(response)
+
         llm = self.initialize_llm()    
         response = llm.invoke(messages).content
         result = json.loads(response)
+        if Config.LLM_CACHE_ENABLED:
+            llm_cache.put(query, metadata_system_prompt, Config.LLM_MODEL, response)
         return result
 
 
-    def search_by_metadata(self, query: str) -> List[str]:
-        """Search images by metadata using external API"""        
-        try:
-            metadata_json = self.create_metadata(query)
-            if not self.is_indexed:
-                if not self.build_image_index():
-                    return []
+    def search_metadata_hits(self, query: str, with_vectors: bool = False,
+                             metadata_json: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Run the metadata-filtered vector search and return the raw hits
 
-            text_embedding = clip_helper.get_text_embedding(query)
+        metadata_json skips the LLM extraction when the filter is already known.
+        """
+        metadata_json = metadata_json or self.create_metadata(query)
+        if not self.is_indexed:
+            if not self.build_image_index():
+                return []
 
-            results = qdrant_helper.metadata_based_searching(
-                # query=query,
-                query_vector=text_embedding.tolist(),
-                metadata_json=metadata_json,
-                limit=Config.IMAGE_TOP_K
-            )
+        text_embedding = clip_helper.get_text_embedding(query)
+
+        return vector_store.metadata_based_searching(
+            # query=query,
+            query_vector=text_embedding.tolist(),
+            metadata_json=metadata_json,
+            limit=Config.IMAGE_TOP_K,
+            with_vectors=with_vectors
+        )
 
+
+    def search_by_metadata(self, query: str, metadata_json: Dict[str, Any] = None) -> List[str]:
+        """Search images by metadata using external API"""        
+        try:
+            results = self.search_metadata_hits(query, metadata_json=metadata_json)
             return [result["payload"]["path"] for result in results]
         except Exception as e:
             logger.error(f"Error in metadata search: {e}")
@@ -294,26 +400,19 @@ class SearchService:
         """Combine metadata and feature-based search"""
         try:
             # metadata_results = self.search_by_api(query)            # For API based searching
-            metadata_results = self.search_by_metadata(query)     # For Metadata based searching
+            metadata_hits = self.search_metadata_hits(query, with_vectors=True)     # For Metadata based searching
             
-            if not metadata_results:
+            if not metadata_hits:
                 return []
             
-            valid_images = []
-            valid_paths = []
-            
-            for path in metadata_results:
-                image = load_image_from_path(path)
-                if image:
-                    valid_images.append(image)
-                    valid_paths.append(path)
-            
-            if not valid_images:
-                return metadata_results
-            
-            top_indices = clip_helper.compare_images_with_text(valid_images, query)
+            # Stored vectors are already normalized, so a dot product with the
+            # normalized query embedding is the image-text cosine similarity
+            vectors = np.asarray([hit["vector"] for hit in metadata_hits], dtype="float32")
+            text_embedding = clip_helper.get_text_embedding(query)
+            scores = vectors @ text_embedding
+            top_indices = np.argsort(scores)[::-1]
             
-            return [valid_paths[idx] for idx in top_indices]
+            return [metadata_hits[idx]["payload"]["path"] for idx in top_indices]
         except Exception as e:
             logger.error(f"Error in hybrid search: {e}")
             return []
@@ -1,32 +1,97 @@
 import torch
+import heapq
 import logging
+import threading
+from collections import OrderedDict
 import numpy as np
 import streamlit as st
-from typing import List, Tuple, Optional
+from itertools import islice
+from typing import Iterable, List, Tuple, Optional, Dict, Union
 from PIL import Image
 from transformers import CLIPProcessor, CLIPModel, CLIPTokenizer
 from config.settings import Config
+from utils.clip_quantization import quantize_model
+from utils.clip_onnx import ONNXCLIPModel, export_onnx, onnx_files_exist
 
 logger = logging.getLogger(__name__)
 
+
+class EmbeddingCache:
+    """Bounded, thread-safe LRU cache of query embeddings keyed by normalized text"""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.lower().split())
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: np.ndarray):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "max_size": self.max_size}
+
+
 class CLIPHelper:
     """Helper class for CLIP model operations"""
     
     def __init__(self):
         self.model_id = Config.CLIP_MODEL_ID
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.device = "cuda" if torch.cuda.is_available() and Config.CLIP_BACKEND != "onnx" else "cpu"
         self.model, self.processor, self.tokenizer = self.load_model()
+        self.text_cache = EmbeddingCache(Config.TEXT_EMBEDDING_CACHE_SIZE)
 
     @staticmethod
     @st.cache_resource
-    def load_model() -> Tuple[CLIPModel, CLIPProcessor, CLIPTokenizer]:
+    def load_model() -> Tuple[Union[CLIPModel, ONNXCLIPModel], CLIPProcessor, CLIPTokenizer]:
         """Load CLIP model, processor, and tokenizer with caching"""
         try:
             device = "cuda" if torch.cuda.is_available() else "cpu"
 
             processor = CLIPProcessor.from_pretrained(Config.CLIP_MODEL_ID)
             tokenizer = CLIPTokenizer.from_pretrained(Config.CLIP_MODEL_ID)
+            if Config.CLIP_BACKEND == "onnx":
+                if not onnx_files_exist():
+                    export_onnx(CLIPModel.from_pretrained(Config.CLIP_MODEL_ID), processor)
+                model = ONNXCLIPModel()
+                logger.info("CLIP model loaded successfully with onnxruntime on cpu")
+                return model, processor, tokenizer
+
             model = CLIPModel.from_pretrained(Config.CLIP_MODEL_ID).to(device)
+            if Config.CLIP_QUANTIZE:
+                if device == "cpu":
+                    model = quantize_model(model.eval())
+                    logger.info("CLIP model quantized to dynamic int8")
+                else:
+                    logger.warning("CLIP_QUANTIZE is only supported on CPU, keeping fp32 model")
             logger.info(f"CLIP model loaded successfully on {device}")
             return model, processor, tokenizer
         except Exception as e:
@@ -35,16 +100,37 @@ class CLIPHelper:
     
     def get_text_embedding(self, text: str) -> np.ndarray:
         """Get text embedding using CLIP"""
+        return self.get_text_embeddings([text])[0]
+
+    def get_text_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Get normalized CLIP embeddings for a list of texts, serving repeats from the LRU cache"""
+        embeddings = np.zeros((len(texts), Config.EMBEDDING_DIM), dtype="float32")
+        keys = [EmbeddingCache.normalize(text) for text in texts]
+
+        pending = {}
+        for idx, key in enumerate(keys):
+            cached = self.text_cache.get(key)
+            if cached is not None:
+                embeddings[idx] = cached
+            else:
+                pending.setdefault(key, []).append(idx)
+
+        if not pending:
+            return embeddings
+
         try:
-            text_inputs = self.processor(text=[text], return_tensors="pt").to(self.device)
+            pending_texts = list(pending)
+            text_inputs = self.processor(text=pending_texts, return_tensors="pt", padding=True).to(self.device)
             with torch.no_grad():
                 text_emb = self.model.get_text_features(**text_inputs)
             text_emb = text_emb.cpu().numpy().astype("float32")
             text_emb = text_emb / np.linalg.norm(text_emb, axis=1, keepdims=True)
-            return text_emb[0]
+            for key, embedding in zip(pending_texts, text_emb):
+                self.text_cache.put(key, embedding)
+                embeddings[pending[key]] = embedding
         except Exception as e:
             logger.error(f"Error getting text embedding: {e}")
-            return np.zeros((Config.EMBEDDING_DIM,), dtype="float32")
+        return embeddings
 
     def get_image_embedding(self, image: Image.Image) -> np.ndarray:
         """Get image embedding using CLIP"""
@@ -58,26 +144,62 @@ class CLIPHelper:
         except Exception as e:
             logger.error(f"Error getting image embedding: {e}")
             return np.zeros((Config.EMBEDDING_DIM,), dtype="float32")
+
+    def get_image_embeddings(self, images: List[Image.Image], batch_size: Optional[int] = None) -> np.ndarray:
+        """Get normalized CLIP embeddings for a list of images, encoded in batches"""
+        batch_size = batch_size or Config.EMBEDDING_BATCH_SIZE
+        embeddings = np.zeros((len(images), Config.EMBEDDING_DIM), dtype="float32")
+        for start in range(0, len(images), batch_size):
+            batch = images[start:start + batch_size]
+            try:
+                inputs = self.processor(images=batch, return_tensors="pt").to(self.device)
+                with torch.no_grad():
+                    image_emb = self.model.get_image_features(**inputs)
+                image_emb = image_emb.cpu().numpy().astype("float32")
+                image_emb = image_emb / np.linalg.norm(image_emb, axis=1, keepdims=True)
+                embeddings[start:start + len(batch)] = image_emb
+            except Exception as e:
+                logger.error(f"Error getting image embeddings for batch at {start}: {e}")
+        return embeddings
     
 
-    def compare_images_with_text(self, images: List[Image.Image], text: str) -> List[int]:
-        """Compare multiple images with text query and return top matches"""
+    def compare_images_with_text(self, images: Iterable[Optional[Image.Image]], text: str, top_k: Optional[int] = None,
+                                 chunk_size: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Compare images with a text query and return the top (index, cosine score) matches
+
+        images may be any iterable, e.g. a generator that loads candidates
+        lazily; it is consumed chunk by chunk and merged through a heap bounded
+        by top_k (Config.IMAGE_TOP_K by default), so memory stays constant in the
+        number of candidates. Candidates that are None or fail to encode are skipped.
+        """
         try:
-            inputs = self.processor(
-                text=[text],
-                images=images,
-                return_tensors="pt",
-                padding=True
-            ).to(self.device)
+            chunk_size = chunk_size or Config.EMBEDDING_BATCH_SIZE
+            top_k = top_k or Config.IMAGE_TOP_K
+            text_emb = self.get_text_embedding(text)
 
-            with torch.no_grad():
-                outputs = self.model(**inputs)
+            heap = []
+            candidates = enumerate(images)
+            while True:
+                chunk = list(islice(candidates, chunk_size))
+                if not chunk:
+                    break
+                chunk = [(idx, image) for idx, image in chunk if image is not None]
+                if not chunk:
+                    continue
+                image_emb = self.get_image_embeddings([image for _, image in chunk], batch_size=chunk_size)
+                # Rows left at zero belong to batches that failed to encode
+                encoded = np.any(image_emb, axis=1)
+                scores = image_emb @ text_emb
+                for (idx, _), ok, score in zip(chunk, encoded.tolist(), scores.tolist()):
+                    if not ok:
+                        continue
+                    item = (score, idx)
+                    if len(heap) < top_k:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
 
-            logits_per_image = outputs.logits_per_image
-            probs = logits_per_image.softmax(dim=0).cpu().numpy().flatten()
-            # top_indices = np.argsort(probs)[::-1][:Config.DEFAULT_TOP_K]
-            top_indices = np.argsort(probs)[::-1]
-            return top_indices.tolist()
+            return [(idx, score) for score, idx in sorted(heap, reverse=True)]
         except Exception as e:
             logger.error(f"Error comparing images with text: {e}")
             return []
@@ -0,0 +1,139 @@
+import os
+import logging
+import numpy as np
+import torch
+from typing import Any, Dict, List
+from PIL import Image
+from transformers import CLIPModel, CLIPProcessor
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+TEXT_ENCODER_FILE = "clip_text.onnx"
+IMAGE_ENCODER_FILE = "clip_image.onnx"
+
+
+class _TextEncoder(torch.nn.Module):
+    def __init__(self, model: CLIPModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model.get_text_features(input_ids=input_ids, attention_mask=attention_mask)
+
+
+class _ImageEncoder(torch.nn.Module):
+    def __init__(self, model: CLIPModel):
+        super().__init__()
+        self.model = model
+
+    def forward(self, pixel_values):
+        return self.model.get_image_features(pixel_values=pixel_values)
+
+
+def onnx_files_exist(output_dir: str = None) -> bool:
+    output_dir = output_dir or Config.ONNX_MODEL_DIR
+    return all(os.path.exists(os.path.join(output_dir, name)) for name in (TEXT_ENCODER_FILE, IMAGE_ENCODER_FILE))
+
+
+def export_onnx(model: CLIPModel, processor: CLIPProcessor, output_dir: str = None, opset: int = 17) -> str:
+    """Export the CLIP text and image encoders to ONNX with a dynamic batch axis"""
+    output_dir = output_dir or Config.ONNX_MODEL_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    model = model.to("cpu").eval()
+
+    text_inputs = processor(text=["a photo", "an ancient painting"], return_tensors="pt", padding=True)
+    torch.onnx.export(
+        _TextEncoder(model),
+        (text_inputs["input_ids"], text_inputs["attention_mask"]),
+        os.path.join(output_dir, TEXT_ENCODER_FILE),
+        input_names=["input_ids", "attention_mask"],
+        output_names=["text_embeds"],
+        dynamic_axes={
+            "input_ids": {0: "batch", 1: "sequence"},
+            "attention_mask": {0: "batch", 1: "sequence"},
+            "text_embeds": {0: "batch"}
+        },
+        opset_version=opset
+    )
+
+    image_inputs = processor(images=[Image.new("RGB", (224, 224))], return_tensors="pt")
+    torch.onnx.export(
+        _ImageEncoder(model),
+        (image_inputs["pixel_values"],),
+        os.path.join(output_dir, IMAGE_ENCODER_FILE),
+        input_names=["pixel_values"],
+        output_names=["image_embeds"],
+        dynamic_axes={"pixel_values": {0: "batch"}, "image_embeds": {0: "batch"}},
+        opset_version=opset
+    )
+    logger.info(f"CLIP encoders exported to ONNX in '{output_dir}'")
+    return output_dir
+
+
+class ONNXCLIPModel:
+    """onnxruntime CPU backend exposing the CLIPModel feature methods used by CLIPHelper"""
+
+    def __init__(self, model_dir: str = None):
+        import onnxruntime as ort
+
+        model_dir = model_dir or Config.ONNX_MODEL_DIR
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self.text_session = ort.InferenceSession(os.path.join(model_dir, TEXT_ENCODER_FILE), options, providers=providers)
+        self.image_session = ort.InferenceSession(os.path.join(model_dir, IMAGE_ENCODER_FILE), options, providers=providers)
+
+    def get_text_features(self, input_ids, attention_mask, **kwargs) -> torch.Tensor:
+        outputs = self.text_session.run(None, {
+            "input_ids": input_ids.cpu().numpy().astype(np.int64),
+            "attention_mask": attention_mask.cpu().numpy().astype(np.int64)
+        })
+        return torch.from_numpy(outputs[0])
+
+    def get_image_features(self, pixel_values, **kwargs) -> torch.Tensor:
+        outputs = self.image_session.run(None, {"pixel_values": pixel_values.cpu().numpy().astype(np.float32)})
+        return torch.from_numpy(outputs[0])
+
+
+def verify_parity(model: CLIPModel, onnx_model: ONNXCLIPModel, processor: CLIPProcessor,
+                  images: List[Image.Image], texts: List[str], atol: float = 1e-3) -> Dict[str, Any]:
+    """Compare PyTorch and onnxruntime embeddings for the same inputs"""
+    model = model.to("cpu").eval()
+    text_inputs = processor(text=texts, return_tensors="pt", padding=True)
+    image_inputs = processor(images=images, return_tensors="pt")
+    with torch.no_grad():
+        torch_text = model.get_text_features(**text_inputs).numpy()
+        torch_image = model.get_image_features(**image_inputs).numpy()
+    onnx_text = onnx_model.get_text_features(**text_inputs).numpy()
+    onnx_image = onnx_model.get_image_features(**image_inputs).numpy()
+
+    def cosine(a, b):
+        return np.sum(a * b, axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+    text_diff = float(np.abs(torch_text - onnx_text).max())
+    image_diff = float(np.abs(torch_image - onnx_image).max())
+    return {
+        "text_max_abs_diff": text_diff,
+        "image_max_abs_diff": image_diff,
+        "text_cosine_min": float(cosine(torch_text, onnx_text).min()),
+        "image_cosine_min": float(cosine(torch_image, onnx_image).min()),
+        "passed": text_diff <= atol and image_diff <= atol
+    }
+
+
+if __name__ == "__main__":
+    from api_sample_data import sample_data
+    from utils.helpers import load_image_from_path
+
+    logging.basicConfig(level=logging.INFO)
+    records = sample_data["results"]["data"][:8]
+    sample_images = [img for img in (load_image_from_path(r["primary_image"]) for r in records) if img]
+    sample_texts = [r["title"] for r in records if r.get("title")]
+
+    torch_model = CLIPModel.from_pretrained(Config.CLIP_MODEL_ID)
+    clip_processor = CLIPProcessor.from_pretrained(Config.CLIP_MODEL_ID)
+    export_onnx(torch_model, clip_processor)
+    report = verify_parity(torch_model, ONNXCLIPModel(), clip_processor, sample_images, sample_texts)
+    for key, value in report.items():
+        print(f"{key}: {value}")
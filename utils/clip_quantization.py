@@ -0,0 +1,92 @@
+import io
+import time
+import logging
+import numpy as np
+import torch
+from typing import Any, Dict, List
+from PIL import Image
+from transformers import CLIPModel, CLIPProcessor
+
+logger = logging.getLogger(__name__)
+
+
+def quantize_model(model: CLIPModel) -> CLIPModel:
+    """Apply dynamic int8 quantization to the linear layers of both CLIP towers (CPU only)"""
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def model_size_mb(model: torch.nn.Module) -> float:
+    """Serialized size of the model weights in megabytes"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell() / (1024 * 1024)
+
+
+def _encode(model: CLIPModel, processor: CLIPProcessor, images: List[Image.Image], texts: List[str]):
+    with torch.no_grad():
+        image_inputs = processor(images=images, return_tensors="pt")
+        image_emb = model.get_image_features(**image_inputs).numpy().astype("float32")
+        text_inputs = processor(text=texts, return_tensors="pt", padding=True)
+        text_emb = model.get_text_features(**text_inputs).numpy().astype("float32")
+    image_emb /= np.linalg.norm(image_emb, axis=1, keepdims=True)
+    text_emb /= np.linalg.norm(text_emb, axis=1, keepdims=True)
+    return image_emb, text_emb
+
+
+def _timed_encode(model, processor, images, texts, repeats: int):
+    _encode(model, processor, images[:1], texts[:1])  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeats):
+        image_emb, text_emb = _encode(model, processor, images, texts)
+    return image_emb, text_emb, (time.perf_counter() - started) / repeats
+
+
+def compare_quantized(model: CLIPModel, processor: CLIPProcessor, images: List[Image.Image],
+                      texts: List[str], k: int = 5, repeats: int = 3) -> Dict[str, Any]:
+    """Compare fp32 and int8 embeddings on a sample set
+
+    Reports per-batch latency, weight size, cosine drift between the fp32 and
+    quantized embeddings, and how much of the fp32 text->image top-k the
+    quantized model still retrieves.
+    """
+    quantized = quantize_model(model)
+    fp32_images, fp32_texts, fp32_latency = _timed_encode(model, processor, images, texts, repeats)
+    int8_images, int8_texts, int8_latency = _timed_encode(quantized, processor, images, texts, repeats)
+
+    image_drift = np.sum(fp32_images * int8_images, axis=1)
+    text_drift = np.sum(fp32_texts * int8_texts, axis=1)
+
+    k = min(k, len(images))
+    fp32_top = np.argsort(-(fp32_texts @ fp32_images.T), axis=1)[:, :k]
+    int8_top = np.argsort(-(int8_texts @ int8_images.T), axis=1)[:, :k]
+    recall = np.mean([len(set(a) & set(b)) / k for a, b in zip(fp32_top, int8_top)])
+
+    return {
+        "fp32_latency_s": round(fp32_latency, 4),
+        "int8_latency_s": round(int8_latency, 4),
+        "speedup": round(fp32_latency / int8_latency, 2) if int8_latency else None,
+        "fp32_size_mb": round(model_size_mb(model), 1),
+        "int8_size_mb": round(model_size_mb(quantized), 1),
+        "image_cosine_mean": round(float(image_drift.mean()), 4),
+        "image_cosine_min": round(float(image_drift.min()), 4),
+        "text_cosine_mean": round(float(text_drift.mean()), 4),
+        "text_cosine_min": round(float(text_drift.min()), 4),
+        f"recall@{k}": round(float(recall), 4)
+    }
+
+
+if __name__ == "__main__":
+    from config.settings import Config
+    from api_sample_data import sample_data
+    from utils.helpers import load_image_from_path
+
+    logging.basicConfig(level=logging.INFO)
+    records = sample_data["results"]["data"]
+    images = [img for img in (load_image_from_path(r["primary_image"]) for r in records) if img]
+    texts = [r["title"] for r in records if r.get("title")]
+
+    fp32_model = CLIPModel.from_pretrained(Config.CLIP_MODEL_ID).eval()
+    clip_processor = CLIPProcessor.from_pretrained(Config.CLIP_MODEL_ID)
+    report = compare_quantized(fp32_model, clip_processor, images, texts)
+    for key, value in report.items():
+        print(f"{key}: {value}")
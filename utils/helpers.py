@@ -1,36 +1,219 @@
+import os
+import hashlib
 import requests
+import threading
 from io import BytesIO
-from PIL import Image, UnidentifiedImageError
-from typing import Optional
+from PIL import Image, UnidentifiedImageError, features
+from typing import Optional, Dict, Any, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config.settings import Config
+from utils.image_cache import ImageCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+_sessions: Dict[int, requests.Session] = {}
+_session_lock = threading.Lock()
+_image_cache: Optional[ImageCache] = None
 
-def load_image_from_path(path: str) -> Optional[Image.Image]:
-    """Load image from local path or URL"""
+
+def get_http_session(retries: Optional[int] = None) -> requests.Session:
+    """Shared keep-alive session with a sized connection pool and retry/backoff for image fetches
+
+    Each retry budget gets its own session, so retries=0 gives a fail-fast
+    session for latency-bound callers such as the results grid.
+    """
+    retries = Config.HTTP_RETRIES if retries is None else retries
+    session = _sessions.get(retries)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(retries)
+            if session is None:
+                retry = Retry(
+                    total=retries,
+                    backoff_factor=Config.HTTP_BACKOFF_FACTOR,
+                    status_forcelist=(429, 500, 502, 503, 504),
+                    allowed_methods=("GET", "HEAD")
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=Config.HTTP_POOL_CONNECTIONS,
+                    pool_maxsize=Config.HTTP_POOL_SIZE,
+                    max_retries=retry
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _sessions[retries] = session
+    return session
+
+
+def get_http_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-host connection pool stats of the shared session"""
+    stats = {}
+    adapters = {adapter for session in list(_sessions.values()) for adapter in session.adapters.values()}
+    for adapter in adapters:
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            stats[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+                "idle_connections": sum(1 for conn in pool.pool.queue if conn) if pool.pool else 0,
+                "max_size": Config.HTTP_POOL_SIZE
+            }
+    return stats
+
+
+def get_image_cache() -> Optional[ImageCache]:
+    """Shared on-disk image cache, or None when IMAGE_CACHE_ENABLED is off"""
+    global _image_cache
+    if _image_cache is None and Config.IMAGE_CACHE_ENABLED:
+        with _session_lock:
+            if _image_cache is None:
+                _image_cache = ImageCache()
+    return _image_cache
+
+
+def fetch_image(path: str, timeout: float = 10,
+                retries: Optional[int] = None) -> Tuple[bytes, Dict[str, Optional[str]]]:
+    """Read raw image bytes from local path or URL, with the origin's ETag / Last-Modified validators"""
+    validators = {"etag": None, "last_modified": None}
+    if path.startswith(("http://", "https://")):
+        session = get_http_session(retries)
+        image_cache = get_image_cache()
+        if image_cache is not None:
+            data = image_cache.fetch(path, session, timeout=timeout)
+            return data, image_cache.validators(path)
+        response = session.get(path, timeout=timeout)
+        response.raise_for_status()
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        return response.content, validators
+    with open(path, "rb") as f:
+        return f.read(), validators
+
+
+def fetch_image_bytes(path: str, timeout: float = 10, retries: Optional[int] = None) -> bytes:
+    """Read raw image bytes from local path or URL"""
+    return fetch_image(path, timeout, retries)[0]
+
+
+def image_changed(path: str, etag: Optional[str], last_modified: Optional[str],
+                  content_hash: Optional[str] = None, timeout: float = 10) -> Optional[bool]:
+    """Ask the origin whether an image changed since it was fetched with these validators
+
+    Sends a conditional GET, so an unchanged image costs a 304 and no body.
+    Returns None when there is nothing to compare against or the check fails.
+    A changed image is dropped from the image cache so it is downloaded again.
+    """
+    if not path.startswith(("http://", "https://")) or not (etag or last_modified):
+        return None
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
     try:
-        if path.startswith(("http://", "https://")):
-            response = requests.get(path, timeout=10)
-            response.raise_for_status()
-            image = Image.open(BytesIO(response.content)).convert("RGB")
+        response = get_http_session().get(path, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+    except requests.RequestException as e:
+        logger.warning(f"Could not check image {path} for changes: {e}")
+        return None
+    # Some origins ignore conditional headers; fall back to the validators and the content hash
+    if etag and response.headers.get("ETag") == etag:
+        return False
+    if content_hash and hashlib.sha256(response.content).hexdigest() == content_hash:
+        return False
+    image_cache = get_image_cache()
+    if image_cache is not None:
+        image_cache.invalidate(path)
+    return True
+
+
+def open_reduced(image: Image.Image, target_size: Optional[int] = None) -> Image.Image:
+    """Decode an opened image at the smallest scale whose sides are still at least target_size
+
+    JPEGs are scaled in the DCT via draft(), so the full-resolution bitmap is
+    never materialised; other formats are shrunk by an integer reduce() factor.
+    """
+    if target_size:
+        if image.format == "JPEG":
+            image.draft("RGB", (target_size, target_size))
         else:
-            image = Image.open(path).convert("RGB")
-        return image
-    except (requests.RequestException, FileNotFoundError, UnidentifiedImageError, OSError) as e:
+            factor = min(image.size) // target_size
+            if factor >= 2:
+                # reduce() only supports direct colour modes, not palette or bilevel images
+                if image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                image = image.reduce(factor)
+    return image.convert("RGB")
+
+
+def decode_image(data: bytes, target_size: Optional[int] = None) -> Image.Image:
+    """Decode raw image bytes into an RGB PIL image, optionally at reduced resolution"""
+    return open_reduced(Image.open(BytesIO(data)), target_size)
+
+
+def load_image_from_path(path: str, target_size: Optional[int] = None, timeout: float = 10,
+                         retries: Optional[int] = None) -> Optional[Image.Image]:
+    """Load image from local path or URL"""
+    try:
+        return decode_image(fetch_image_bytes(path, timeout, retries), target_size)
+    except (requests.RequestException, FileNotFoundError, UnidentifiedImageError, OSError, ValueError) as e:
         logger.warning(f"Failed to load image {path}: {e}")
         return None
 
 
-def validate_image(image_file) -> bool:
-    """Validate uploaded image file"""
-    if image_file is None:
-        return False
-    
+def thumbnail_path_for(path: str, size: int = None) -> str:
+    """Location of the cached thumbnail for an image path or URL"""
+    size = size or Config.THUMBNAIL_SIZE
+    extension = "webp" if features.check("webp") else "jpg"
+    key = hashlib.sha256(f"{size}:{path}".encode("utf-8")).hexdigest()
+    return os.path.join(Config.THUMBNAIL_DIR, key[:2], f"{key}.{extension}")
+
+
+def save_thumbnail(path: str, image: Image.Image, size: int = None) -> Optional[str]:
+    """Write a fixed-size thumbnail of an already decoded image and return its file path"""
+    thumbnail_path = thumbnail_path_for(path, size)
+    if os.path.exists(thumbnail_path):
+        return thumbnail_path
     try:
-        image = Image.open(image_file)
-        image.verify()
-        return True
-    except Exception:
-        return False
+        size = size or Config.THUMBNAIL_SIZE
+        thumbnail = image.copy()
+        thumbnail.thumbnail((size, size))
+        os.makedirs(os.path.dirname(thumbnail_path), exist_ok=True)
+        tmp_path = f"{thumbnail_path}.{threading.get_ident()}.tmp"
+        thumbnail.save(tmp_path, format="WEBP" if thumbnail_path.endswith(".webp") else "JPEG",
+                       quality=Config.THUMBNAIL_QUALITY)
+        os.replace(tmp_path, thumbnail_path)
+        return thumbnail_path
+    except OSError as e:
+        logger.warning(f"Failed to save thumbnail for {path}: {e}")
+        return None
+
+
+def get_thumbnail(path: str, size: int = None, timeout: float = 10, retries: Optional[int] = None) -> Optional[str]:
+    """Return the thumbnail file for an image, generating it on first use"""
+    thumbnail_path = thumbnail_path_for(path, size)
+    if os.path.exists(thumbnail_path):
+        return thumbnail_path
+    image = load_image_from_path(path, target_size=size or Config.THUMBNAIL_SIZE, timeout=timeout, retries=retries)
+    if image is None:
+        return None
+    return save_thumbnail(path, image, size)
+
 
+def load_uploaded_image(image_file, target_size: Optional[int] = None) -> Optional[Image.Image]:
+    """Validate and decode an uploaded file straight from its in-memory buffer in one pass"""
+    if image_file is None:
+        return None
+    try:
+        image = open_reduced(Image.open(BytesIO(image_file.getvalue())), target_size or Config.CLIP_IMAGE_SIZE)
+        image.load()
+        return image
+    except Exception as e:
+        logger.warning(f"Invalid uploaded image: {e}")
+        return None
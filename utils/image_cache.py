@@ -0,0 +1,171 @@
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import requests
+from typing import Any, Dict, Optional
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class ImageCache:
+    """On-disk, content-addressed cache of downloaded images with LRU eviction
+
+    Files are stored under the SHA-256 of their URL. Entries younger than the
+    TTL are served without touching the network; older ones are revalidated
+    with If-None-Match / If-Modified-Since and only re-downloaded on change.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, ttl: int = None):
+        self.cache_dir = cache_dir or Config.IMAGE_CACHE_DIR
+        self.max_bytes = max_bytes or Config.IMAGE_CACHE_MAX_BYTES
+        self.ttl = Config.IMAGE_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.bytes_from_cache = 0
+        self.bytes_downloaded = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(self.cache_dir, "index.sqlite3"), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                validated_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key)
+
+    def _entry(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, size, validated_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._file_path(key)):
+            return None
+        return dict(zip(("etag", "last_modified", "size", "validated_at"), row))
+
+    def _read(self, key: str, validated: bool = False) -> bytes:
+        with open(self._file_path(key), "rb") as f:
+            data = f.read()
+        now = time.time()
+        with self._lock:
+            if validated:
+                self._conn.execute("UPDATE entries SET last_access = ?, validated_at = ? WHERE key = ?", (now, now, key))
+            else:
+                self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.bytes_from_cache += len(data)
+        return data
+
+    def _store(self, key: str, url: str, response: requests.Response) -> bytes:
+        data = response.content
+        path = self._file_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.headers.get("ETag"), response.headers.get("Last-Modified"), len(data), now, now)
+            )
+            self._conn.commit()
+            self.bytes_downloaded += len(data)
+        self._evict()
+        return data
+
+    def _evict(self):
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                try:
+                    os.remove(self._file_path(key))
+                except FileNotFoundError:
+                    pass
+                total -= size
+                self.evictions += 1
+            self._conn.commit()
+
+    def fetch(self, url: str, session: requests.Session, timeout: int = 10) -> bytes:
+        """Return the bytes for url, downloading or revalidating only when needed"""
+        key = self.key_for(url)
+        entry = self._entry(key)
+        headers = {}
+        if entry is not None:
+            if time.time() - entry["validated_at"] < self.ttl:
+                with self._lock:
+                    self.hits += 1
+                return self._read(key)
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = session.get(url, headers=headers, timeout=timeout)
+        if entry is not None and response.status_code == 304:
+            with self._lock:
+                self.revalidated += 1
+            return self._read(key, validated=True)
+        response.raise_for_status()
+        with self._lock:
+            self.misses += 1
+        return self._store(key, url, response)
+
+    def validators(self, url: str) -> Dict[str, Optional[str]]:
+        """ETag and Last-Modified the origin sent for the cached copy of url"""
+        entry = self._entry(self.key_for(url)) or {}
+        return {"etag": entry.get("etag"), "last_modified": entry.get("last_modified")}
+
+    def invalidate(self, url: str):
+        """Drop the cached copy of url so the next fetch downloads it again"""
+        key = self.key_for(url)
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+        try:
+            os.remove(self._file_path(key))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size, count = self._conn.execute("SELECT COALESCE(SUM(size), 0), COUNT(*) FROM entries").fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "evictions": self.evictions,
+            "bytes_from_cache": self.bytes_from_cache,
+            "bytes_downloaded": self.bytes_downloaded,
+            "entries": count,
+            "size_bytes": size,
+            "max_bytes": self.max_bytes
+        }
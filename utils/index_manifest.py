@@ -0,0 +1,91 @@
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class IndexManifest:
+    """SQLite manifest of indexed artworks used to skip unchanged records on rebuild"""
+
+    FIELDS = ("image_url", "content_hash", "model_id", "payload_hash", "indexed_at", "etag", "last_modified")
+
+    def __init__(self, path: str = None, model_id: str = None):
+        self.path = path or Config.INDEX_MANIFEST_PATH
+        self.model_id = model_id or Config.CLIP_MODEL_ID
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS artworks (
+                id TEXT PRIMARY KEY,
+                image_url TEXT NOT NULL,
+                content_hash TEXT,
+                model_id TEXT NOT NULL,
+                payload_hash TEXT NOT NULL,
+                indexed_at TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT
+            )
+            """
+        )
+        # Manifests written before validators were tracked lack the last two columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(artworks)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE artworks ADD COLUMN {column} TEXT")
+        self._conn.commit()
+
+    @staticmethod
+    def payload_hash(payload: Dict[str, Any]) -> str:
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, artwork_id: Any) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM artworks WHERE id = ?",
+                (str(artwork_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(self.FIELDS, row))
+
+    def is_current(self, artwork_id: Any, image_url: str, payload: Dict[str, Any]) -> bool:
+        """True if the artwork is already indexed with the same image URL, payload and model"""
+        entry = self.get(artwork_id)
+        return (
+            entry is not None
+            and entry["image_url"] == image_url
+            and entry["model_id"] == self.model_id
+            and entry["payload_hash"] == self.payload_hash(payload)
+        )
+
+    def mark_indexed(self, entries: List[Tuple[Any, str, Dict[str, Any], Optional[str], Dict[str, Optional[str]]]]):
+        """Record (id, image url, payload, content hash, validators) entries as indexed with the current model"""
+        indexed_at = datetime.now().isoformat()
+        rows = [
+            (str(artwork_id), image_url, content_hash, self.model_id, self.payload_hash(payload), indexed_at,
+             validators.get("etag"), validators.get("last_modified"))
+            for artwork_id, image_url, payload, content_hash, validators in entries
+        ]
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO artworks (id, {', '.join(self.FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM artworks").fetchone()[0]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM artworks")
+            self._conn.commit()
+        logger.info("Index manifest cleared")
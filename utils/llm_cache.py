@@ -0,0 +1,80 @@
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """Persistent, TTL-bounded cache of deterministic (temperature=0) LLM answers
+
+    Entries are keyed by normalized query, a hash of the prompt and the model
+    name, and stored in SQLite so every Streamlit session and process shares them.
+    """
+
+    def __init__(self, path: str = None, ttl: int = None):
+        self.path = path or Config.LLM_CACHE_PATH
+        self.ttl = Config.LLM_CACHE_TTL if ttl is None else ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, prompt: str, model: str) -> str:
+        normalized = " ".join(query.lower().split())
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        return hashlib.sha256(f"{model}\0{prompt_hash}\0{normalized}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str, prompt: str, model: str) -> Optional[str]:
+        key = self.make_key(query, prompt, model)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, query: str, prompt: str, model: str, response: str):
+        key = self.make_key(query, prompt, model)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)", (key, response, time.time())
+                )
+                self._conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (time.time() - self.ttl,))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to cache LLM response: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries
+        }
+
+
+llm_cache = LLMCache()
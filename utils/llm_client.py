@@ -0,0 +1,68 @@
+import time
+import httpx
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+from langchain_groq import ChatGroq
+from config.settings import Config
+
+logger = logging.getLogger(__name__)
+
+GROQ_BASE_URL = "https://api.groq.com"
+
+_http_client: Optional[httpx.Client] = None
+_llm_clients: Dict[Tuple[str, float], ChatGroq] = {}
+_llm_lock = threading.Lock()
+
+
+def get_llm_http_client() -> httpx.Client:
+    """Shared keep-alive httpx client so every LLM instance reuses the same TLS connections"""
+    global _http_client
+    if _http_client is None:
+        with _llm_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    limits=httpx.Limits(
+                        max_connections=Config.LLM_POOL_SIZE,
+                        max_keepalive_connections=Config.LLM_POOL_SIZE
+                    ),
+                    timeout=Config.LLM_TIMEOUT
+                )
+    return _http_client
+
+
+def get_llm(model: str = None, temperature: float = 0) -> ChatGroq:
+    """Lazily created, process-wide ChatGroq client for the given model and temperature"""
+    key = (model or Config.LLM_MODEL, temperature)
+    llm = _llm_clients.get(key)
+    if llm is None:
+        http_client = get_llm_http_client()
+        with _llm_lock:
+            llm = _llm_clients.get(key)
+            if llm is None:
+                llm = ChatGroq(
+                    model=key[0],
+                    temperature=temperature,
+                    api_key=Config.GROQ_API_KEY,
+                    http_client=http_client,
+                    max_retries=Config.LLM_RETRIES
+                )
+                _llm_clients[key] = llm
+                logger.info(f"Created LLM client for {key[0]} (temperature={temperature})")
+    return llm
+
+
+def warm_up_llm(model: str = None) -> bool:
+    """Build the default client and open a pooled TLS connection to the API ahead of the first query"""
+    get_llm(model)
+    start = time.perf_counter()
+    try:
+        response = get_llm_http_client().get(
+            f"{GROQ_BASE_URL}/openai/v1/models",
+            headers={"Authorization": f"Bearer {Config.GROQ_API_KEY}"}
+        )
+        logger.info(f"LLM connection warmed up in {time.perf_counter() - start:.2f}s (HTTP {response.status_code})")
+        return response.is_success
+    except httpx.HTTPError as e:
+        logger.warning(f"LLM warm-up failed: {e}")
+        return False
@@ -0,0 +1,268 @@
+import os
+import re
+import json
+import logging
+import threading
+import numpy as np
+from typing import List, Optional, Dict, Any, Union, Tuple, Set
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import PointStruct, ScoredPoint
+from qdrant_client.models import Filter, FieldCondition, MatchText, MatchValue
+from config.settings import Config
+from utils.vector_store_base import VectorStore, build_metadata_filter
+
+logger = logging.getLogger(__name__)
+
+VECTORS_FILE = "vectors.f32"
+META_FILE = "meta.json"
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, matching the word splitting of Qdrant's text index"""
+    return re.findall(r"[^\W_]+", text.lower())
+
+
+class NumpyVectorStore(VectorStore):
+    """In-process vector store over a memory-mapped float32 matrix of normalized embeddings
+
+    Search is a single matrix product followed by an argpartition top-k, with
+    payload filters evaluated as NumPy masks. Meant for small catalogues and
+    offline runs where a Qdrant server is not worth the extra hop.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.NUMPY_STORE_PATH
+        self.embedding_dim = Config.EMBEDDING_DIM
+        self._lock = threading.RLock()
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[Any, int] = {}
+        self._vectors: Optional[np.memmap] = None
+        self._capacity = 0
+        self._columns: Dict[Tuple[str, str], np.ndarray] = {}
+        self._load()
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, VECTORS_FILE)
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.path, META_FILE)
+
+    def _load(self):
+        if not os.path.exists(self._meta_path):
+            return
+        with open(self._meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["dim"] != self.embedding_dim:
+            raise ValueError(f"Stored vectors have dimension {meta['dim']}, expected {self.embedding_dim}")
+        self._ids = meta["ids"]
+        self._payloads = meta["payloads"]
+        self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+        self._capacity = os.path.getsize(self._vectors_path) // (4 * self.embedding_dim)
+        if self._capacity:
+            self._vectors = np.memmap(self._vectors_path, dtype="float32", mode="r+",
+                                      shape=(self._capacity, self.embedding_dim))
+        logger.info(f"Loaded {len(self._ids)} vectors from '{self.path}'")
+
+    def _save_meta(self):
+        tmp_path = self._meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dim": self.embedding_dim, "ids": self._ids, "payloads": self._payloads}, f)
+        os.replace(tmp_path, self._meta_path)
+
+    def _ensure_capacity(self, size: int):
+        if size <= self._capacity:
+            return
+        capacity = max(size, self._capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(capacity * self.embedding_dim * 4)
+        self._vectors = np.memmap(self._vectors_path, dtype="float32", mode="r+",
+                                  shape=(capacity, self.embedding_dim))
+        self._capacity = capacity
+
+    def create_collection(self) -> bool:
+        """Create the on-disk store if it doesn't exist"""
+        try:
+            with self._lock:
+                os.makedirs(self.path, exist_ok=True)
+                if not os.path.exists(self._meta_path):
+                    open(self._vectors_path, "ab").close()
+                    self._save_meta()
+                    logger.info(f"Vector store created at '{self.path}'")
+                else:
+                    logger.info(f"Vector store at '{self.path}' already exists")
+            return True
+        except Exception as e:
+            logger.error(f"Error creating vector store: {e}")
+            return False
+
+    def count_points(self) -> int:
+        """Return the number of points stored"""
+        return len(self._ids)
+
+    def payload_values(self, key: str) -> Set[Any]:
+        """Return the distinct values of a payload field"""
+        with self._lock:
+            return {payload[key] for payload in self._payloads if payload.get(key) is not None}
+
+    def upsert_points(self, points: List[PointStruct], batch_size: int = None,
+                      parallel: int = None, wait: bool = True) -> bool:
+        """Insert or update points, normalizing vectors as Qdrant does for cosine distance"""
+        if not points:
+            return True
+        try:
+            vectors = np.asarray([point.vector for point in points], dtype="float32")
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors = vectors / np.where(norms == 0, 1, norms)
+            with self._lock:
+                new_ids = {point.id for point in points if point.id not in self._rows}
+                self._ensure_capacity(len(self._ids) + len(new_ids))
+                for point, vector in zip(points, vectors):
+                    row = self._rows.get(point.id)
+                    if row is None:
+                        row = len(self._ids)
+                        self._rows[point.id] = row
+                        self._ids.append(point.id)
+                        self._payloads.append(point.payload or {})
+                    else:
+                        self._payloads[row] = point.payload or {}
+                    self._vectors[row] = vector
+                self._vectors.flush()
+                self._save_meta()
+                self._columns = {}
+            logger.info(f"Successfully upserted {len(points)} points")
+            return True
+        except Exception as e:
+            logger.error(f"Error upserting points: {e}")
+            return False
+
+    def _column(self, key: str, kind: str) -> np.ndarray:
+        """Payload field as a numeric (NaN for missing) or word-token text array, cached until the next upsert"""
+        column = self._columns.get((key, kind))
+        if column is None:
+            values = [payload.get(key) for payload in self._payloads]
+            if kind == "number":
+                column = np.array([
+                    float(v) if isinstance(v, (int, float)) else np.nan for v in values
+                ], dtype="float64")
+            else:
+                # Space-led word tokens, so " " + token finds a word starting with that token
+                column = np.array([
+                    "" if v is None else " " + " ".join(tokenize(str(v))) for v in values
+                ], dtype=str)
+            self._columns[(key, kind)] = column
+        return column
+
+    def _condition_mask(self, condition: FieldCondition) -> np.ndarray:
+        if condition.range is not None:
+            column = self._column(condition.key, "number")
+            mask = ~np.isnan(column)
+            bounds = condition.range
+            if bounds.gt is not None:
+                mask &= column > bounds.gt
+            if bounds.gte is not None:
+                mask &= column >= bounds.gte
+            if bounds.lt is not None:
+                mask &= column < bounds.lt
+            if bounds.lte is not None:
+                mask &= column <= bounds.lte
+            return mask
+        if isinstance(condition.match, MatchText):
+            # Same semantics as Qdrant's prefix-tokenized text index: every query
+            # word must be a prefix of some word in the field
+            column = self._column(condition.key, "text")
+            mask = np.ones(len(column), dtype=bool)
+            for token in tokenize(condition.match.text):
+                mask &= np.char.find(column, " " + token) >= 0
+            return mask
+        if isinstance(condition.match, MatchValue):
+            return np.array([payload.get(condition.key) == condition.match.value for payload in self._payloads])
+        raise ValueError(f"Unsupported filter condition on '{condition.key}'")
+
+    def _filter_mask(self, query_filter: Filter) -> np.ndarray:
+        if query_filter.should or query_filter.must_not:
+            raise ValueError("Only 'must' filters are supported by the NumPy vector store")
+        mask = np.ones(len(self._ids), dtype=bool)
+        for condition in query_filter.must or []:
+            mask &= self._condition_mask(condition)
+        return mask
+
+    def _search(self, query_vector: List[float], limit: int, score_threshold: float = None,
+                query_filter: Filter = None) -> List[Tuple[int, float]]:
+        """Top-k (row, score) pairs by cosine similarity"""
+        count = len(self._ids)
+        if count == 0 or limit <= 0:
+            return []
+        query = np.asarray(query_vector, dtype="float32")
+        query = query / (np.linalg.norm(query) or 1)
+        scores = self._vectors[:count] @ query
+
+        if query_filter is not None:
+            scores = np.where(self._filter_mask(query_filter), scores, -np.inf)
+        if score_threshold:
+            scores = np.where(scores >= score_threshold, scores, -np.inf)
+
+        k = min(limit, count)
+        top = np.argpartition(-scores, k - 1)[:k] if k < count else np.arange(count)
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top if np.isfinite(scores[row])]
+
+    def _hit(self, row: int, score: float, with_payload: bool = True, with_vectors: bool = False) -> Dict[str, Any]:
+        hit = {"id": self._ids[row], "score": score, "payload": self._payloads[row] if with_payload else None}
+        if with_vectors:
+            hit["vector"] = self._vectors[row].tolist()
+        return hit
+
+    def search_vectors(self, query_vector: List[float], limit: int,
+                       score_threshold: float = None) -> List[Dict[str, Any]]:
+        """Search for similar vectors"""
+        try:
+            with self._lock:
+                return [self._hit(row, score) for row, score in self._search(query_vector, limit, score_threshold)]
+        except Exception as e:
+            logger.error(f"Error searching vectors: {e}")
+            return []
+
+    def query_points(self, query: List[float], limit: int,
+                     score_threshold: float = None, with_payload: bool = True) -> Optional[QueryResponse]:
+        """Query points and return a Qdrant-style QueryResponse"""
+        try:
+            with self._lock:
+                hits = [self._hit(row, score, with_payload) for row, score in self._search(query, limit, score_threshold)]
+            return QueryResponse(points=[
+                ScoredPoint(id=hit["id"], version=0, score=hit["score"], payload=hit["payload"]) for hit in hits
+            ])
+        except Exception as e:
+            logger.error(f"Error querying points: {e}")
+            return None
+
+    def search_many(self, query_vectors: List[List[float]], limit: int,
+                    filters: Optional[Union[Filter, List[Optional[Filter]]]] = None,
+                    score_threshold: float = None, with_payload: bool = True) -> List[List[Dict[str, Any]]]:
+        """Run several vector searches at once"""
+        if filters is None or isinstance(filters, Filter):
+            filters = [filters] * len(query_vectors)
+        try:
+            with self._lock:
+                return [
+                    [self._hit(row, score, with_payload) for row, score in self._search(query_vector, limit, score_threshold, query_filter)]
+                    for query_vector, query_filter in zip(query_vectors, filters)
+                ]
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            return [[] for _ in query_vectors]
+
+    def metadata_based_searching(self, query_vector: List[float], metadata_json: Dict[str, Any], limit: int,
+                                 with_vectors: bool = False) -> List[Dict[str, Any]]:
+        """Search vectors restricted by the metadata fields extracted from a query"""
+        search_filter = build_metadata_filter(metadata_json)
+        with self._lock:
+            return [
+                self._hit(row, score, with_vectors=with_vectors)
+                for row, score in self._search(query_vector, limit, query_filter=search_filter)
+            ]
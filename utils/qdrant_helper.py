@@ -1,22 +1,116 @@
+import time
 import logging
-from typing import List, Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict, Any, Union, Set
 from qdrant_client import QdrantClient
 # from qdrant_client.http.models import Filter, FieldCondition, Range, MatchValue
 
-from qdrant_client.models import VectorParams, Distance, PointStruct, QueryResponse
-from qdrant_client.models import Filter, FieldCondition, MatchText, Range
+from qdrant_client.models import VectorParams, Distance, PointStruct, QueryResponse, QueryRequest
+from qdrant_client.models import Filter
+from qdrant_client.models import HnswConfigDiff, ScalarQuantization, ScalarQuantizationConfig, ScalarType
+from qdrant_client.models import VectorParamsDiff, Disabled, CollectionConfig
+from qdrant_client.models import SearchParams, QuantizationSearchParams
+from qdrant_client.models import IntegerIndexParams, IntegerIndexType, TextIndexParams, TextIndexType, TokenizerType
 from config.settings import Config
+from utils.vector_store_base import VectorStore, build_metadata_filter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class QdrantHelper:
+# Payload indexes backing the filters built in metadata_based_searching. The
+# prefix tokenizer keeps MatchText close to its unindexed substring behaviour
+# (e.g. "water" still matches "watercolour").
+_TEXT_INDEX = TextIndexParams(
+    type=TextIndexType.TEXT,
+    tokenizer=TokenizerType.PREFIX,
+    lowercase=True
+)
+PAYLOAD_INDEXES = {
+    "period_start": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True),
+    "period_end": IntegerIndexParams(type=IntegerIndexType.INTEGER, lookup=False, range=True),
+    "artist_name": _TEXT_INDEX,
+    "medium": _TEXT_INDEX,
+    "department": _TEXT_INDEX,
+    "paper_support": _TEXT_INDEX
+}
+
+
+def build_collection_config(profile: Dict[str, Any], embedding_dim: int) -> Dict[str, Any]:
+    """Collection creation arguments for a tuning profile from Config.COLLECTION_PROFILES"""
+    config = {
+        "vectors_config": VectorParams(
+            size=embedding_dim,
+            distance=Distance.COSINE,
+            on_disk=profile.get("on_disk")
+        )
+    }
+    if "m" in profile or "ef_construct" in profile:
+        config["hnsw_config"] = HnswConfigDiff(
+            m=profile.get("m"),
+            ef_construct=profile.get("ef_construct"),
+            on_disk=profile.get("on_disk")
+        )
+    if profile.get("quantization"):
+        config["quantization_config"] = ScalarQuantization(
+            scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+        )
+    return config
+
+
+def build_profile_update(profile: Dict[str, Any], current: CollectionConfig) -> Dict[str, Any]:
+    """update_collection arguments that bring an existing collection in line with a tuning profile
+
+    Only settings the profile specifies and the stored collection differs on
+    are included, so an already matching collection yields an empty dict.
+    """
+    update = {}
+    target = build_collection_config(profile, 0)
+
+    vectors = current.params.vectors
+    if "on_disk" in profile and isinstance(vectors, VectorParams) and bool(vectors.on_disk) != profile["on_disk"]:
+        update["vectors_config"] = {"": VectorParamsDiff(on_disk=profile["on_disk"])}
+
+    hnsw = target.get("hnsw_config")
+    if hnsw is not None and (
+        (hnsw.m is not None and hnsw.m != current.hnsw_config.m)
+        or (hnsw.ef_construct is not None and hnsw.ef_construct != current.hnsw_config.ef_construct)
+        or (hnsw.on_disk is not None and hnsw.on_disk != bool(current.hnsw_config.on_disk))
+    ):
+        update["hnsw_config"] = hnsw
+
+    if "quantization" in profile:
+        quantized = isinstance(current.quantization_config, ScalarQuantization)
+        if profile["quantization"] and not quantized:
+            update["quantization_config"] = target["quantization_config"]
+        elif not profile["quantization"] and current.quantization_config is not None:
+            update["quantization_config"] = Disabled.DISABLED
+    return update
+
+
+def build_search_params(profile: Dict[str, Any]) -> Optional[SearchParams]:
+    """Search-time parameters for a tuning profile, or None for Qdrant's defaults"""
+    if not profile:
+        return None
+    quantization = None
+    if profile.get("quantization"):
+        quantization = QuantizationSearchParams(rescore=True, oversampling=profile.get("oversampling"))
+    return SearchParams(hnsw_ef=profile.get("hnsw_ef"), quantization=quantization)
+
+
+class QdrantHelper(VectorStore):
     """Helper class for Qdrant operations"""
     
     def __init__(self):
-        self.client = QdrantClient(host=Config.QDRANT_HOST, port=Config.QDRANT_PORT)
+        self.client = QdrantClient(
+            host=Config.QDRANT_HOST,
+            port=Config.QDRANT_PORT,
+            grpc_port=Config.QDRANT_GRPC_PORT,
+            prefer_grpc=Config.QDRANT_PREFER_GRPC
+        )
         self.collection_name = Config.COLLECTION_NAME
         self.embedding_dim = Config.EMBEDDING_DIM
+        self.profile = Config.COLLECTION_PROFILES.get(Config.COLLECTION_PROFILE, {})
+        self.search_params = build_search_params(self.profile)
         
     def create_collection(self) -> bool:
         """Create Qdrant collection if it doesn't exist"""
@@ -24,33 +118,122 @@ class QdrantHelper:
             if not self.client.collection_exists(self.collection_name):
                 self.client.create_collection(
                     collection_name=self.collection_name,
-                    vectors_config=VectorParams(
-                        size=self.embedding_dim, 
-                        distance=Distance.COSINE
-                    )
+                    **build_collection_config(self.profile, self.embedding_dim)
                 )
-                logger.info(f"Collection '{self.collection_name}' created successfully")
-                return True
+                logger.info(f"Collection '{self.collection_name}' created successfully with profile '{Config.COLLECTION_PROFILE}'")
             else:
                 logger.info(f"Collection '{self.collection_name}' already exists")
-                return True
+                self.apply_collection_profile()
+            return self.create_payload_indexes()
         except Exception as e:
             logger.error(f"Error creating collection: {e}")
             return False
-    
-    def upsert_points(self, points: List[PointStruct]) -> bool:
-        """Insert or update points in the collection"""
+
+    def apply_collection_profile(self) -> bool:
+        """Update an existing collection's HNSW, quantization and on-disk settings to the configured profile"""
         try:
-            self.client.upsert(
-                collection_name=self.collection_name,
-                points=points
-            )
-            logger.info(f"Successfully upserted {len(points)} points")
+            current = self.client.get_collection(self.collection_name).config
+            update = build_profile_update(self.profile, current)
+            if not update:
+                return True
+            self.client.update_collection(collection_name=self.collection_name, **update)
+            logger.info(f"Collection '{self.collection_name}' updated to profile '{Config.COLLECTION_PROFILE}' "
+                        f"({', '.join(update)}); Qdrant rebuilds the affected segments in the background")
+            return True
+        except Exception as e:
+            logger.warning(f"Collection '{self.collection_name}' does not match profile "
+                           f"'{Config.COLLECTION_PROFILE}' and could not be updated: {e}")
+            return False
+
+    def create_payload_indexes(self) -> bool:
+        """Create the payload indexes used by metadata filtering, skipping ones that already exist"""
+        try:
+            existing = self.client.get_collection(self.collection_name).payload_schema or {}
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                if field_name in existing:
+                    continue
+                self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                    wait=True
+                )
+                logger.info(f"Payload index created on '{field_name}'")
             return True
         except Exception as e:
-            logger.error(f"Error upserting points: {e}")
+            logger.error(f"Error creating payload indexes: {e}")
             return False
     
+    def count_points(self) -> int:
+        """Return the number of points stored in the collection"""
+        try:
+            return self.client.count(collection_name=self.collection_name, exact=True).count
+        except Exception as e:
+            logger.error(f"Error counting points: {e}")
+            return 0
+
+    def payload_values(self, key: str) -> Set[Any]:
+        """Return the distinct values of a payload field across the collection"""
+        values, offset = set(), None
+        try:
+            while True:
+                records, offset = self.client.scroll(
+                    collection_name=self.collection_name,
+                    limit=1000,
+                    offset=offset,
+                    with_payload=[key],
+                    with_vectors=False
+                )
+                values.update(record.payload[key] for record in records if record.payload.get(key) is not None)
+                if offset is None:
+                    return values
+        except Exception as e:
+            logger.error(f"Error reading payload values for '{key}': {e}")
+            return values
+
+    def upsert_points(self, points: List[PointStruct], batch_size: int = None,
+                      parallel: int = None, wait: bool = True) -> bool:
+        """Insert or update points in the collection
+
+        Points are sent in chunks of batch_size across parallel worker threads,
+        each chunk retried on its own. With wait=False the chunks are not
+        acknowledged individually; the final chunk is sent with wait=True
+        afterwards as a consistency barrier.
+        """
+        if not points:
+            return True
+        batch_size = batch_size or Config.QDRANT_UPSERT_BATCH_SIZE
+        parallel = parallel or Config.QDRANT_UPSERT_PARALLEL
+        chunks = [points[i:i + batch_size] for i in range(0, len(points), batch_size)]
+        barrier = None if wait else chunks.pop()
+
+        with ThreadPoolExecutor(max_workers=min(parallel, max(len(chunks), 1))) as executor:
+            results = list(executor.map(lambda chunk: self._upsert_chunk(chunk, wait), chunks))
+        if barrier is not None:
+            results.append(self._upsert_chunk(barrier, True))
+
+        failed = results.count(False)
+        if failed:
+            logger.error(f"Failed to upsert {failed} of {len(results)} chunks")
+            return False
+        logger.info(f"Successfully upserted {len(points)} points")
+        return True
+
+    def _upsert_chunk(self, points: List[PointStruct], wait: bool) -> bool:
+        for attempt in range(1, Config.QDRANT_UPSERT_RETRIES + 1):
+            try:
+                self.client.upsert(
+                    collection_name=self.collection_name,
+                    points=points,
+                    wait=wait
+                )
+                return True
+            except Exception as e:
+                logger.warning(f"Error upserting chunk of {len(points)} points (attempt {attempt}): {e}")
+                if attempt < Config.QDRANT_UPSERT_RETRIES:
+                    time.sleep(0.5 * 2 ** (attempt - 1))
+        return False
+    
     def search_vectors(self, query_vector: List[float], limit: int, 
                       score_threshold: float = None) -> List[Dict[str, Any]]:
         """Search for similar vectors"""
@@ -58,7 +241,8 @@ class QdrantHelper:
             search_params = {
                 "collection_name": self.collection_name,
                 "query_vector": query_vector,
-                "limit": limit
+                "limit": limit,
+                "search_params": self.search_params
             }
             
             if score_threshold:
@@ -87,7 +271,8 @@ class QdrantHelper:
                 "collection_name": self.collection_name,
                 "query": query,
                 "limit": limit,
-                "with_payload": with_payload
+                "with_payload": with_payload,
+                "search_params": self.search_params
             }
             
             if score_threshold:
@@ -98,46 +283,63 @@ class QdrantHelper:
             logger.error(f"Error querying points: {e}")
             return None
 
-
-    def metadata_based_searching(self, query_vector: List[float], metadata_json: str, limit: int) -> List[str]:
-        """Search images by metadata using external API"""
-        must_conditions = []
-        for key, value in metadata_json.items():
-            if key == "period":                
-                must_conditions.extend([
-                    FieldCondition(
-                        key="period_start",
-                        range=Range(lt=value)
-                    ),
-                    FieldCondition(
-                        key="period_end",
-                        range=Range(gt=value)
-                    )
-                ])
-            else:
-                must_conditions.append(
-                    FieldCondition(
-                        key=key,
-                        match=MatchText(text=value.lower())
-                    )
+    def search_many(self, query_vectors: List[List[float]], limit: int,
+                    filters: Optional[Union[Filter, List[Optional[Filter]]]] = None,
+                    score_threshold: float = None, with_payload: bool = True) -> List[List[Dict[str, Any]]]:
+        """Run several vector searches in a single batch request"""
+        if not query_vectors:
+            return []
+        if filters is None or isinstance(filters, Filter):
+            filters = [filters] * len(query_vectors)
+        try:
+            batch_requests = [
+                QueryRequest(
+                    query=query_vector,
+                    filter=query_filter,
+                    limit=limit,
+                    score_threshold=score_threshold or None,
+                    with_payload=with_payload,
+                    params=self.search_params
                 )
+                for query_vector, query_filter in zip(query_vectors, filters)
+            ]
+            responses = self.client.query_batch_points(
+                collection_name=self.collection_name,
+                requests=batch_requests
+            )
+            return [
+                [{"id": point.id, "score": point.score, "payload": point.payload} for point in response.points]
+                for response in responses
+            ]
+        except Exception as e:
+            logger.error(f"Error in batch search: {e}")
+            return [[] for _ in query_vectors]
 
-        search_filter = Filter(must=must_conditions)
+
+    def metadata_based_searching(self, query_vector: List[float], metadata_json: Dict[str, Any], limit: int,
+                                 with_vectors: bool = False) -> List[Dict[str, Any]]:
+        """Search images by metadata using external API"""
+        search_filter = build_metadata_filter(metadata_json)
 
         search_results = self.client.search(
             collection_name=self.collection_name,
             query_vector=query_vector, 
             query_filter=search_filter,
-            limit=limit
+            limit=limit,
+            with_vectors=with_vectors,
+            search_params=self.search_params
         )
        
         results = []
         for searches in search_results:
-            results.append({
+            result = {
                 "id": searches.id,
                 "score": searches.score,
                 "payload": searches.payload
-            })
+            }
+            if with_vectors:
+                result["vector"] = searches.vector
+            results.append(result)
        
         return results
 
@@ -1,23 +1,125 @@
+import time
+import logging
 import streamlit as st
-from .helpers import load_image_from_path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from config.settings import Config
+from .helpers import load_image_from_path, get_thumbnail
 
-def show_results(image_paths):
+logger = logging.getLogger(__name__)
+
+_image_executor = ThreadPoolExecutor(max_workers=Config.RESULTS_IMAGE_WORKERS)
+_prefetch_executor = ThreadPoolExecutor(max_workers=Config.RESULTS_PREFETCH_WORKERS)
+
+
+def show_full_image(img_path, idx):
+    """Offer the full-resolution image on demand instead of rendering it inline"""
+    if img_path.startswith(("http://", "https://")):
+        st.markdown(f"[Full size]({img_path})")
+    elif st.button("Full size", key=f"full_{idx}"):
+        img = load_image_from_path(img_path)
+        if img:
+            st.image(img, use_column_width=True)
+
+
+def _prefetch(image_paths):
+    """Warm the thumbnail cache for upcoming results without blocking the render"""
+    for img_path in image_paths:
+        _prefetch_executor.submit(get_thumbnail, img_path)
+
+
+def _change_page(delta):
+    st.session_state["results_page"] += delta
+
+
+def show_pagination(page, total_pages, position):
+    prev_col, label_col, next_col = st.columns([1, 2, 1])
+    with prev_col:
+        st.button("Previous", key=f"prev_{position}", disabled=page == 0,
+                  on_click=_change_page, args=(-1,))
+    with label_col:
+        st.markdown(f"Page {page + 1} of {total_pages}")
+    with next_col:
+        st.button("Next", key=f"next_{position}", disabled=page >= total_pages - 1,
+                  on_click=_change_page, args=(1,))
+
+
+def show_result(placeholder, future, img_path, idx):
+    """Fill one result slot, or mark it unavailable if loading its image failed"""
+    try:
+        thumbnail = future.result()
+    except Exception as e:
+        logger.warning(f"Failed to load result {img_path}: {e}")
+        thumbnail = None
+    with placeholder.container():
+        if thumbnail:
+            st.image(thumbnail, caption=f"Result {idx + 1}", use_column_width=True)
+            show_full_image(img_path, idx)
+        else:
+            st.caption(f"Result {idx + 1} unavailable")
+
+
+def show_results(image_paths, page_size=None):
     if not image_paths:
         st.warning("No results found.")
         return
 
+    page_size = page_size or Config.RESULTS_PAGE_SIZE
+    total_pages = (len(image_paths) + page_size - 1) // page_size
+
+    # Start from the first page whenever a new result set comes in
+    results_key = hash(tuple(image_paths))
+    if st.session_state.get("results_key") != results_key:
+        st.session_state["results_key"] = results_key
+        st.session_state["results_page"] = 0
+    page = min(st.session_state["results_page"], total_pages - 1)
+
+    start = page * page_size
+    page_paths = image_paths[start:start + page_size]
+    _prefetch(image_paths[start + page_size:start + 2 * page_size])
+
     st.subheader(f"Results ({len(image_paths)})")
+    if total_pages > 1:
+        show_pagination(page, total_pages, "top")
+
     cols_per_row = 4
-    rows = (len(image_paths) + cols_per_row - 1) // cols_per_row
+    rows = (len(page_paths) + cols_per_row - 1) // cols_per_row
 
+    placeholders = []
     for row in range(rows):
         cols = st.columns(cols_per_row)
         for col_idx in range(cols_per_row):
             idx = row * cols_per_row + col_idx
-            if idx < len(image_paths):
+            if idx < len(page_paths):
                 with cols[col_idx]:
-                    img_path = image_paths[idx]
-                    img = load_image_from_path(img_path)
-                    if img:
-                        st.image(img, caption=f"Result {idx + 1}", use_column_width=True)
-                    # st.caption(str(img_path))
+                    placeholder = st.empty()
+                    placeholder.caption(f"Loading result {start + idx + 1}...")
+                    placeholders.append(placeholder)
+
+    # Fetch the page concurrently and fill each slot as soon as its image is ready. Each
+    # slot's deadline starts at submission, so fetches stuck in the shared queue time out
+    # too, and the fetch itself fails fast (short timeout, no retries) instead of holding a worker
+    deadline = time.monotonic() + Config.RESULTS_IMAGE_TIMEOUT
+    futures = {
+        _image_executor.submit(get_thumbnail, img_path, timeout=Config.RESULTS_IMAGE_TIMEOUT, retries=0): idx
+        for idx, img_path in enumerate(page_paths)
+    }
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = futures[future]
+                show_result(placeholders[idx], future, page_paths[idx], start + idx)
+            if time.monotonic() >= deadline:
+                for future in pending:
+                    idx = futures[future]
+                    placeholders[idx].caption(f"Result {start + idx + 1} timed out")
+                pending = set()
+    finally:
+        # Drop queued work for this page if the script is rerun or stopped
+        for future in futures:
+            future.cancel()
+
+    if total_pages > 1:
+        show_pagination(page, total_pages, "bottom")
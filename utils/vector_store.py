@@ -0,0 +1,17 @@
+from config.settings import Config
+from utils.vector_store_base import VectorStore
+
+
+def get_vector_store(backend: str = None) -> VectorStore:
+    """Return the vector store for the configured backend ("qdrant" or "numpy")"""
+    backend = (backend or Config.VECTOR_STORE_BACKEND).lower()
+    if backend == "numpy":
+        from utils.numpy_store import NumpyVectorStore
+        return NumpyVectorStore()
+    if backend == "qdrant":
+        from utils.qdrant_helper import qdrant_helper
+        return qdrant_helper
+    raise ValueError(f"Unknown vector store backend '{backend}', expected 'qdrant' or 'numpy'")
+
+
+vector_store = get_vector_store()
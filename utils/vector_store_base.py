@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Dict, Any, Union, Set
+from qdrant_client.http.models import QueryResponse
+from qdrant_client.models import PointStruct
+from qdrant_client.models import Filter, FieldCondition, MatchText, Range
+
+
+def build_metadata_filter(metadata_json: Dict[str, Any]) -> Filter:
+    """Build the payload filter for the metadata fields extracted from a query"""
+    must_conditions = []
+    for key, value in metadata_json.items():
+        if key == "period":
+            # A single year, or a [start, end] range matched by overlap
+            start, end = value if isinstance(value, (list, tuple)) else (value, value)
+            must_conditions.extend([
+                FieldCondition(
+                    key="period_start",
+                    range=Range(lt=end)
+                ),
+                FieldCondition(
+                    key="period_end",
+                    range=Range(gt=start)
+                )
+            ])
+        else:
+            must_conditions.append(
+                FieldCondition(
+                    key=key,
+                    match=MatchText(text=value.lower())
+                )
+            )
+    return Filter(must=must_conditions)
+
+
+class VectorStore(ABC):
+    """Interface shared by the vector store backends used by the search stack"""
+
+    @abstractmethod
+    def create_collection(self) -> bool:
+        """Create the collection if it doesn't exist"""
+
+    @abstractmethod
+    def count_points(self) -> int:
+        """Return the number of points stored in the collection"""
+
+    @abstractmethod
+    def payload_values(self, key: str) -> Set[Any]:
+        """Return the distinct values of a payload field across the collection"""
+
+    @abstractmethod
+    def upsert_points(self, points: List[PointStruct], batch_size: int = None,
+                      parallel: int = None, wait: bool = True) -> bool:
+        """Insert or update points in the collection"""
+
+    @abstractmethod
+    def search_vectors(self, query_vector: List[float], limit: int,
+                       score_threshold: float = None) -> List[Dict[str, Any]]:
+        """Search for similar vectors"""
+
+    @abstractmethod
+    def query_points(self, query: List[float], limit: int,
+                     score_threshold: float = None, with_payload: bool = True) -> Optional[QueryResponse]:
+        """Query points and return a Qdrant-style QueryResponse"""
+
+    @abstractmethod
+    def search_many(self, query_vectors: List[List[float]], limit: int,
+                    filters: Optional[Union[Filter, List[Optional[Filter]]]] = None,
+                    score_threshold: float = None, with_payload: bool = True) -> List[List[Dict[str, Any]]]:
+        """Run several vector searches at once"""
+
+    @abstractmethod
+    def metadata_based_searching(self, query_vector: List[float], metadata_json: Dict[str, Any], limit: int,
+                                 with_vectors: bool = False) -> List[Dict[str, Any]]:
+        """Search vectors restricted by the metadata fields extracted from a query"""